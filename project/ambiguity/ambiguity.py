@@ -19,16 +19,19 @@ Date: 11.7.2024 1.1.0 updating the initialization of a canvas
 
 # libraries to be imported
 import sys
-import platform as pf
-import subprocess
+import time
+import json
+import hashlib
 import warnings
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy as cp
-import itertools
 import bdb
 import numpy as np
-import matplotlib.pyplot as plt
 # ### import matplotlib as mpl    # needed only for mpl.use initializing graph
-from IPython import get_ipython   # comment if not using ipython
+# note, matplotlib.pyplot is imported when first used, see plt below, and
+# IPython only when initializing a Graph under its control
 
 
 # ### change the "user-defined parameters" below as you see fit ###
@@ -117,14 +120,10 @@ GRAPHICS = {'xmin': -2000., 'xmax': 4500., 'zmin': -100., 'zmax': 4000.}
 # set canvas controller
 # !!! GRAPHICS['control'] = 'ipython'
 GRAPHICS['control'] = 'matplotlib'
-# select options for canvas manager
-if GRAPHICS['control'] == 'ipython':   # suitable for use with, e.g., Spyder
-    # plot 'inline' or external in a 'qt' window
-    GRAPHICS.update({'modus': 'inline'})
-    # !!! GRAPHICS.update({'modus': 'qt5'})
-# select options for matplotlib
-if GRAPHICS['control'] == 'matplotlib':   # suitable for use with Python
-    GRAPHICS.update({'modus': 'QtAgg'})
+# set canvas manager, or leave it to configure() with a default for control:
+# 'inline' for ipython, suitable for use with, e.g., Spyder, and 'QtAgg' for
+# matplotlib, suitable for use with Python
+# !!! GRAPHICS['modus'] = 'qt5'
 
 
 # interface properties
@@ -134,9 +133,6 @@ FACEDASHES = {'original': [1, 0], 'stretch': [20, 5]}
 # ray properties
 LINECOLOR = ['b', 'g', 'r', 'c', 'm', 'y', 'b', 'g', 'r', 'c', 'm', 'y']
 LINEDASHES = {'original': [1, 0], 'stretch': [8, 2]}
-assert \
-    len(LINECOLOR) >= len(TRAVELTIMES), \
-    'not enough COLOR\'s for all TRAVELTIMES'
 
 
 # printouts
@@ -152,6 +148,9 @@ SLOWPRINT = False        # slowness
 RAYPRINT = False         # ray info
 CROSSPRINT = True        # cross points
 SEGMENTPRINT = False     # traveltime in segment
+FARPRINT = False         # number of rays parallel / behind in segment
+MISFITPRINT = False      # misfit of stretched versus original wavefronts
+ARRIVALPRINT = False     # misfit of stretched versus original arrivals
 # Note, DIFFPHASECHECK compares numerically calculated differences between
 # successive phase angles with the analytically calculated differential; so,
 # use an extremely small interval for the source angle and a large number of
@@ -167,15 +166,73 @@ CONSTPLOT = [False, False, False]
 # RAYPLOT works best with 1 huge traveltime and very few angles
 
 
+# wavefront sampling
+FRONTSPACING = 0.   # arc length between samples of wavefronts; 0 for per ray
+# note, FRONTSPACING > 0 resamples each wavefront inside the graphics window
+# at uniform arc length for plotting and MISFITPRINT, instead of one point
+# per ray
+
+
+# surface arrivals
+ARRIVALSPACING = 0.   # offset between surface traveltimes compared; 0 for off
+# note, ARRIVALSPACING > 0 interpolates the first-arrival traveltimes of the
+# rays emerged at the surface onto a common offset grid, for both states, and
+# compares them for ARRIVALPRINT and the summary returned by main()
+
+
+# wavefront export
+FRONTEXPORT = ""   # file name stem of the exported wavefronts; none if empty
+FRONTALIGN = 4096   # alignment in bytes of the header and arrays in the file
+# note, FRONTEXPORT writes, per traveltime, <stem><index>.front holding the
+# arrays xxx, zzz, time and done of each wavefront in full resolution, after
+# a one-line JSON header with DEMO, traveltime, a hash of the model and the
+# offset, dtype and shape of each array; Fronts.load maps them lazily
+
+
+# accuracy check
+ACCURACY = False       # T/F for checking the solver per layer, no propagation
+ACCURACYNOS = 100001   # number of phase angles over (-90, +90) degree
+ACCURACYGRAZE = 1.     # Snell's angle not searched within degree of grazing
+# note, ACCURACY compares the analytic differential phase velocity and energy
+# angle in each layer and state with numpy gradient, and searches Snell's
+# angle for the slowness of each phase angle along the base of the layer
+# itself; then, main() stops without propagating wavefronts. A vectorized
+# alternative to DIFFPHASECHECK during a full run. The search converges slowly
+# at grazing incidence; so, ACCURACYGRAZE excludes those slownesses.
+
+
 # printouts
 PUBLIC = False
 PUBLICWIDTH = 524 / 72.27   # width PS points for SEG article / LaTeX big point
 PUBLICHEIGHT = 20           # something larger than required
 PUBLICEPS = "SubsurfaceModel.eps"
-PUBLICWIN = True            # routine correcting bounding box on Windows
+PUBLICFIT = True            # routine fitting bounding box to PUBLICWIDTH
 PUBLICPNG = ""              # file not written if string empty
-# note, PUBLICWIN is fragile: it requires gswin64c, hardcoded that is, from
-# ghostscript, and it works only on Windows
+# note, PUBLICFIT measures the tight bounding box with the matplotlib renderer
+# in memory; no file is written and no ghostscript required while fitting
+
+
+# incremental recomputation
+INCREMENTAL = False   # T/F for reusing legs of travelpaths of earlier runs
+CACHESIZE = 0         # maximum number of legs cached, 0 for all of a run
+# note, INCREMENTAL keeps the state of the rays after each leg of a travelpath,
+# keyed by the parameters of all layers traversed so far; rerunning main()
+# after changing, e.g., TARGET resumes from the first leg affected. The legs
+# of the latest run are kept, that is up to len(TRAVELTIMES) * len(DEMO) *
+# len(PATH) = 96 legs by default. Each leg cached holds 7 arrays of floats and
+# 3 of bools, that is about 59 bytes per ray or 106 MB for SOURCE['nos'] =
+# 1800001, and about 10 GB for a default run; so, reduce SOURCE['nos'] or set
+# CACHESIZE > 0 to forget the oldest legs beyond, at the cost of reusing less
+
+
+# concurrency
+WORKERS = 1   # number of threads propagating the states of DEMO concurrently
+# note, the states share nothing but the source, and numpy releases the GIL in
+# its array operations; so, WORKERS = len(DEMO) may shorten the wall time on
+# a multi-core node, up to halving it. This is not measured; on a single core,
+# WORKERS = 2 is slower, 40.0 s versus 37.3 s for SOURCE['nos'] = 360001. The
+# wavefronts are plotted afterwards in the main thread, but printouts of the
+# states may interleave. WORKERS = 1 is required with RAYPLOT, see configure.
 
 
 # ### hard-wired parameters ### hard-wired parameters ### hard-wired parameters
@@ -191,15 +248,14 @@ DEMO = ['original', 'stretch']
 #   'xxx': origin of coordinate system
 #   'zzz': origin of coordinate system
 #   'time': source time
-#   'g': stretch factor in source layer
+#   'g': stretch factor in source layer, set by configure()
 # For now, the source is located at the surface and, hence, emit only
 # downwards. To treat a buried source, split the source layer above and below
 # the source level, and propagate accordingly. Not tested.
 SOURCE.update({
     'xxx': 0.,
     'zzz': 0.,
-    'time': 0.,
-    'ggg': STACK[0]['ggg']})
+    'time': 0.})
 
 
 # surface
@@ -217,6 +273,9 @@ FACETOL = +1.e-10
 MAXDSINE = 1.e-10   # maximum last update in radian to exit search
 SCLFAC = 0.5        # scaling factor of update; note, decreased during search
 MAXITERAT = 1000    # emergency break: maximum number of iterations
+SNELLFORM = True    # T/F for Snell's angle in closed form if elliptical
+# note, SNELLFORM solves Snell's law directly in layers with rrr4 = 0,
+# stretched or not, and searches iteratively in anelliptic layers only
 
 
 # some insane large distance
@@ -228,6 +287,20 @@ LARGEDISTANCE = 1234567890
 NULL = 0.
 
 
+# list of layer parameters stored in a stack
+LAYERLIST = [
+    'vvv0',    # reference velocity
+    'rrr2',    # 2nd phase velocity coefficient
+    'rrr4',    # 4th phase velocity coefficient
+    'tilt',    # tilt of symmetry axis
+    'thick',   # thickness along the vertical
+    'depth',   # base reflector depth
+    'dip',     # base reflector dip
+    'ang',     # opening angle
+    'ggg'      # stretch factor
+]
+
+
 # list of velocity parameters
 PARAMETERLIST = [
     'name',   # name (for reference only)
@@ -257,7 +330,165 @@ NONETYPE = type(None)
 
 
 # testing only
-DEBUG = True
+DEBUG = True         # T / F for debug / production mode
+CHECKSAMPLE = 1000   # number of rays checked in production mode
+# note, DEBUG turns all warnings into errors, traps all numpy floating-point
+# errors and runs all sanity checks over all rays in each segment. Production
+# mode ignores floating-point errors, for nan's and inf's are expected for
+# rays completed or parallel to an interface, checks the front once after each
+# segment, and runs all other sanity checks over a sample of CHECKSAMPLE rays,
+# evenly spaced, so failures reproduce. Both modes compute identical fronts;
+# production mode is only about 3% faster (40.2 s versus 41.5 s measured for
+# the default SOURCE), for the Snell search in Phase.search dominates.
+
+
+# ### configuration ### configuration ### configuration ### configuration ###
+
+
+class Lazy():
+    """
+    Import a module on first use.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('name', 'module')
+
+    def __init__(self, name=None):
+        """
+        Defer importing a module.
+
+        Parameters
+        ----------
+        name : str
+            module name
+
+        Returns
+        -------
+        none
+
+        """
+        self.name = name
+        self.module = None
+
+    def __getattr__(self, attr):
+        # import once
+        if self.module is None:
+            self.module = importlib.import_module(self.name)
+        # return
+        return getattr(self.module, attr)
+
+
+# pyplot, imported when a Graph is set up
+plt = Lazy(name='matplotlib.pyplot')
+
+
+def configure():
+    """
+    Derive and check the settings depending on other user-defined parameters.
+
+    Note, called by main() for each run; so, parameters may be changed after
+    importing the module.
+
+    Raises
+    ------
+    AssertionError
+        inconsistent parameters
+
+    Returns
+    -------
+    none
+
+    """
+    # select default canvas manager
+    if GRAPHICS['control'] == 'ipython':
+        GRAPHICS.setdefault('modus', 'inline')
+    if GRAPHICS['control'] == 'matplotlib':
+        GRAPHICS.setdefault('modus', 'QtAgg')
+    # check colors
+    assert \
+        len(LINECOLOR) >= len(TRAVELTIMES), \
+        'not enough COLOR\'s for all TRAVELTIMES'
+    # check concurrency
+    # note, RAYPLOT plots from Front.crosspoint, that is from the worker
+    # threads, but matplotlib is not thread-safe
+    assert \
+        WORKERS == 1 or not RAYPLOT, \
+        'keep WORKERS = 1 with RAYPLOT'
+    # stretch factor of the source layer
+    SOURCE['ggg'] = STACK[0]['ggg']
+
+
+# ### check ### check ### check ### check ### check ### check ### check ###
+
+
+def sample(nos=None):
+    """
+    Select the rays to be checked.
+
+    Parameters
+    ----------
+    nos : int
+        number of rays
+
+    Returns
+    -------
+    index : slice or np.array of int
+        all rays in DEBUG mode, CHECKSAMPLE evenly spaced rays otherwise
+
+    """
+    # all rays
+    if DEBUG or nos <= CHECKSAMPLE:
+        return slice(None)
+    # sample, deterministically for reproducible failures
+    return np.linspace(0, nos - 1, CHECKSAMPLE).astype(int)
+
+
+def check(test=None, nos=None, text=None):
+    """
+    Check a condition for all rays or a sample of rays.
+
+    Parameters
+    ----------
+    test : function
+        returns T / F for valid / invalid rays given an index as from sample
+    nos : int
+        number of rays
+    text : str
+        message if invalid
+
+    Raises
+    ------
+    AssertionError
+        any ray checked invalid
+
+    Returns
+    -------
+    none
+
+    """
+    # check
+    assert np.all(test(sample(nos=nos))), text
+
+
+def numerics(**kwargs):
+    """
+    Set the treatment of numpy floating-point errors.
+
+    Parameters
+    ----------
+    kwargs : dict
+        see np.errstate; applied in DEBUG mode only
+
+    Returns
+    -------
+    np.errstate
+        as given in DEBUG mode, ignoring all floating-point errors otherwise
+
+    """
+    # return
+    return np.errstate(**kwargs) if DEBUG else np.errstate(all='ignore')
 
 
 # ### parameter ### parameter ### parameter ### parameter ### parameter ###
@@ -455,6 +686,8 @@ class Surface():
 
     # pylint: disable=too-few-public-methods
 
+    __slots__ = ('name', 'depth', 'dip')
+
     def __init__(self, surface=None):
         """
         Initialize Surface parameters, typically set in global SURFACE.
@@ -500,12 +733,11 @@ class LayerGeneric():
     """
 
     # pylint: disable=too-few-public-methods
-    # pylint: disable=too-many-instance-attributes
-    # pylint: disable=invalid-name
 
-    def __init__(self, layer=None):
+    @staticmethod
+    def convert(layer=None):
         """
-        Initialize the characterization of a 3-term medium.
+        Convert the characterization of a 3-term medium.
 
         In future, media belonging to different elasticity classes are calling
         respective functions and, here, are characterized as a 3-term medium.
@@ -518,44 +750,69 @@ class LayerGeneric():
                 vvv0=<float>,    # reference velocity, updated for stretch
                 rrr2=<float>,    # anisotropy parameter
                 rrr4=<float>,    # anisotropy parameter
-                tilt=<float>),   # tilt of symmetry axis
                 thick=<float>,   # thickness perpendicular to top under source
-                depth=<float>,   # depth of base interface
                 dip=<float>,     # layer dip in deg, to be converted into rad
-                ang=<float>,     # opening angle: dip_(i) - dip_(i-1)
                 g=<float>        # stretch factor
             Parameters of TTI elasticity and a layer
 
         Returns
         -------
-        none
+        record : tuple
+            values in the order of LAYERLIST; tilt, depth and opening angle
+            are to be defined in Stack
 
         """
-        self.name = layer['name']
-        self.vvv0 = layer['vvv0']
-        self.rrr2 = layer['rrr2']
-        self.rrr4 = layer['rrr4']
-        self.tilt = np.nan                    # to be defined in Stack
-        self.thick = layer['thick']
-        self.depth = np.nan                   # to be defined in Stack
-        self.dip = np.deg2rad(layer['dip'])
-        self.ang = np.nan
-        self.ggg = layer['ggg']
+        # return
+        return (
+            layer['vvv0'],
+            layer['rrr2'],
+            layer['rrr4'],
+            np.nan,                     # tilt, to be defined in Stack
+            layer['thick'],
+            np.nan,                     # depth, to be defined in Stack
+            np.deg2rad(layer['dip']),
+            np.nan,                     # ang, to be defined in Stack
+            layer['ggg'])
 
 
 class Layer():
     """
     Characterize properties and structure of a layer.
 
+    A layer is a lightweight view onto one record of a Stack: reading or
+    setting an attribute in LAYERLIST reads or sets that record.
+
     """
 
     # pylint: disable=too-few-public-methods
 
+    __slots__ = ('stack', 'index')
+
     LAYERCONVERT = {'generic': LayerGeneric}
 
-    def __init__(self, layer=None):
+    def __init__(self, stack=None, index=None):
+        """
+        Initialize a view onto a layer of a stack.
+
+        Parameters
+        ----------
+        stack : Stack
+            stack of layers
+        index : int
+            index of layer in stack
+
+        Returns
+        -------
+        none
+
+        """
+        self.stack = stack
+        self.index = index
+
+    @classmethod
+    def convert(cls, layer=None):
         """
-        Initialize the call to another layer conversion.
+        Call the correct layer conversion.
 
         Parameters
         ----------
@@ -564,37 +821,97 @@ class Layer():
 
         Returns
         -------
-        none
+        record : tuple
+            values in the order of LAYERLIST
 
         """
         # call correct layer conversion
-        self.LAYERCONVERT[layer['key']].__init__(self, layer=layer)
+        return cls.LAYERCONVERT[layer['key']].convert(layer=layer)
+
+    @property
+    def name(self):
+        """
+        Look up the name of a layer.
+
+        Returns
+        -------
+        name : str
+            name of layer
+
+        """
+        return self.stack.names[self.stack.data['id'][self.index]]
+
+
+def _layerfield(field=None):
+    """
+    Define a property reading / writing a field of a layer record.
+
+    Parameters
+    ----------
+    field : str
+        field in LAYERLIST
+
+    Returns
+    -------
+    property
+
+    """
+
+    def _get(self):
+        return self.stack.data[field][self.index]
+
+    def _set(self, value):
+        self.stack.data[field][self.index] = value
+
+    # return
+    return property(_get, _set, doc=f"{field} of layer, see LayerGeneric")
+
+
+for _field in LAYERLIST:
+    setattr(Layer, _field, _layerfield(field=_field))
 
 
-class Stack(list):
+class Stack():
     """
     Characterize a stack of layers.
 
+    All layer parameters are stored in a structured array, one record per
+    layer, with the names of the layers referenced by an integer id; so, a
+    stack is cheap to copy and can be operated on column-wise. Indexing or
+    iterating a stack gives Layer views onto the records.
+
     """
 
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, stack=None):
+    __slots__ = ('data', 'names', 'nos')
+
+    DTYPE = np.dtype(
+        [('id', np.int32)] + [(item, float) for item in LAYERLIST])
+
+    def __init__(self, stack=None, names=None):
         """
         Initialize a stack of layers.
 
         Parameters
         ----------
-        stack : list
-            a list of layers, which follow the definition in Layer
+        stack : list or np.array
+            a list of layers, which follow the definition in Layer; or a
+            structured array of dtype Stack.DTYPE as created by Stack.load
+        names : tuple of str
+            names of layers referenced by the id of a record; required only
+            with a structured array
 
         Instance
         --------
-        self[i].attribute where
-            i : number of layers in stack
-            attribute : any attribute of Layer
-        self[i].tilt : tilt of symmetry axis, with
-            self[0].tilt perpendicular to surface as required
+        self.data : np.array of Stack.DTYPE
+            self.data[attribute][i] where
+                i : number of layers in stack
+                attribute : id or any attribute in LAYERLIST
+        self.data['tilt'] : tilt of symmetry axis, with
+            self.data['tilt'][0] perpendicular to surface as required
+        self.names : tuple of str
+            names of layers
         self.nos : number of layers in stack
 
         Returns
@@ -602,40 +919,117 @@ class Stack(list):
         none
 
         """
+        # take a structured array as it is
+        if isinstance(stack, np.ndarray):
+            self.data = np.array(stack, dtype=self.DTYPE)
+            self.names = tuple(names)
+            self.nos = len(self.data)
+            return
         # convert STACK according to Layer notation and create a stack
-        stack = [Layer(layer=layer) for layer in stack]
-        # inherit
-        super().__init__(stack)   # defining self as list subclass here
+        self.names = tuple(layer['name'] for layer in stack)
+        self.data = np.array(
+            [(iii,) + Layer.convert(layer=layer)
+             for iii, layer in enumerate(stack)],
+            dtype=self.DTYPE)
         # number of layers
-        self.nos = len(stack)
+        self.nos = len(self.data)
         # tilt of symmetry axis relative to vertical:
         # note, the vertical is rotated normal to the layer top
         # note, the angle is measured with respect to the vertical, not the
         # horizontal as the layer dip
-        self[0].tilt = 0.
-        for iii in range(1, self.nos):
-            self[iii].tilt = -1 * self[iii-1].dip
+        self.data['tilt'][0] = 0.
+        self.data['tilt'][1:] = -1 * self.data['dip'][:-1]
         # opening angle
-        self[0].ang = self[0].dip
-        for iii in range(1, self.nos):
-            self[iii].ang = self[iii].dip - self[iii-1].dip
+        self.data['ang'] = np.diff(self.data['dip'], prepend=0.)
         # depth
-        stack[0].depth = stack[0].thick
-        for iii in range(1, self.nos, 1):
-            self[iii].depth = self[iii-1].depth + self[iii].thick
-        # cross point
-        self.cross = None
+        self.data['depth'] = np.cumsum(self.data['thick'])
+
+    def __len__(self):
+        return self.nos
+
+    def __getitem__(self, index):
+        # allow for negative indices as a list
+        return Layer(stack=self, index=range(self.nos)[index])
+
+    def __iter__(self):
+        return (Layer(stack=self, index=iii) for iii in range(self.nos))
+
+    def __deepcopy__(self, memo):
+        """
+        Copy a stack of layers.
+
+        Parameters
+        ----------
+        memo : dict
+            see copy.deepcopy
+
+        Returns
+        -------
+        stack : Stack
+            copy of stack
+
+        """
+        # return
+        return Stack(stack=self.data, names=self.names)
+
+    def save(self, file=None):
+        """
+        Save a stack of layers into a NumPy .npz file.
+
+        Parameters
+        ----------
+        file : str or file
+            see np.savez
+
+        Returns
+        -------
+        self : Stack
+            saved, but unchanged
+
+        """
+        # save records and names
+        np.savez(file, data=self.data, names=np.array(self.names))
+        # return
+        return self
+
+    @classmethod
+    def load(cls, file=None):
+        """
+        Load a stack of layers from a NumPy .npz file.
+
+        Parameters
+        ----------
+        file : str or file
+            as written by Stack.save
+
+        Returns
+        -------
+        stack : Stack
+            loaded stack of layers
+
+        """
+        # load records and names
+        with np.load(file) as npz:
+            stack = cls(stack=npz['data'], names=npz['names'].tolist())
+        # return
+        return stack
 
 
 class StackAux():
     """
-    Define auxiliary variables for Stacks
+    Define auxiliary variables for Stacks.
+
+    All variables are arrays over the layers of a stack; points in the
+    vertical plane are complex numbers x + i z, such that a rotation and a
+    stretch turn into a complex multiplication.
 
     """
 
     # pylint: disable=too-few-public-methods
 
-    __slots__ = ('gfac', 'rot', 'velfac', 'dist', 'iii', 'jjj')
+    __slots__ = (
+        'gfac', 'rot', 'velfac', 'dist', 'zero', 'cross', 'newcross', 'amp',
+        'shift')
 
     def __init__(self):
         """
@@ -643,18 +1037,25 @@ class StackAux():
 
         Instance
         --------
-        gfac : float
+        gfac : np.array of float
             stretch factor as defined in the paper
-        rot : float
+        rot : np.array of float
             amount of rotation as defined in the paper
-        velfac : float
+        velfac : np.array of float
             velocity increase as defined in the paper
-        dist : float
+        dist : np.array of float
             length of top normal, used while computing a new thickness
-        iii : int
-            index of layer to be stretched
-        jjj : int
-            index of any layer underneath the stretched one
+        zero : np.array of complex
+            intercept of the top of a layer with the vertical
+        cross : np.array of complex
+            cross point of top normal and base
+        newcross : np.array of complex
+            cross point of top normal and base after stretch
+        amp : np.array of complex
+            rotation and stretch, composed over all layers above and including
+            the current one
+        shift : np.array of complex
+            shift, composed as amp
 
         Returns
         -------
@@ -662,102 +1063,104 @@ class StackAux():
 
         """
         # define stretch-related parameters
-        self.gfac = np.nan
-        self.rot = np.nan
-        self.velfac = np.nan
+        self.gfac = None
+        self.rot = None
+        self.velfac = None
         # define length of the "normal" vector
-        self.dist = np.nan
-        # indices
-        self.iii = np.nan   # index of layer to be stretched
-        self.jjj = np.nan   # index of layer underneath the stretched one
+        self.dist = None
+        # define construction points
+        self.zero = None
+        self.cross = None
+        self.newcross = None
+        # define composed transforms
+        self.amp = None
+        self.shift = None
 
-    def inside(self):
+    def setup(self, stack=None):
         """
-        Reset auxiliary variables for the stretched layer.
-
-        Returns
-        -------
-        self : StackAux
-            gfac : 1
-                stretch factor reset (neutral value = 1)
-            dist : np.nan
-                nan'ed for safety
+        Define all stretch-involved parameters.
 
-        """
-        # reset
-        self.gfac = np.nan
-        self.rot = np.nan
-        self.velfac = np.nan
-        self.dist = np.nan
-        self.iii = self.iii    # keep
-        self.jjj = np.nan
-        # return
-        return self
+        Stretching a layer rotates its base by rot about the cross point of top
+        normal and base, scales by velfac and moves the cross point onto its
+        stretched position; the layers below undergo the same similarity
+        transform. The transform is independent of the point chosen along the
+        top; so, all layers can be set up with their original geometry, and
+        the transforms of all layers above are composed by a cumulative
+        product and sum.
 
-    def below(self):
-        """
-        Reset auxiliary variables for layers below the stretched one.
+        Parameters
+        ----------
+        stack : Stack
+            original stack of layers
 
         Returns
         -------
         self : StackAux
-            gfac : 1
-                stretch factor reset (neutral value = 1)
-            dist : np.nan
-                nan'ed for safety
+            see above
 
         """
-        # reset
-        self.gfac = 1.              # neutral
-        self.rot = self.rot         # keep
-        self.velfac = self.velfac   # keep
-        self.dist = np.nan          # initially unknown
-        self.iii = self.iii         # keep
-        self.jjj = self.jjj         # keep
+        # extract layer parameters
+        ggg = stack.data['ggg']
+        ang = stack.data['ang']
+        dip = stack.data['dip']
+        depth = stack.data['depth']
+        thick = stack.data['thick']
+        # dip and depth of the top of each layer, the surface on top
+        topdip = np.concatenate(([0.], dip[:-1]))
+        topdepth = np.concatenate(([0.], depth[:-1]))
+        # calculate stretch term
+        self.gfac = np.sqrt(1. + ggg)
+        # calculate additive base rotation
+        # note, exactly 0 without stretch
+        self.rot = np.where(
+            ggg == 0., 0., np.arctan(self.gfac * np.tan(ang)) - ang)
+        # calculate multiplicative velocity increase
+        self.velfac = np.sqrt(1. + ggg * np.sin(ang) ** 2)
+        # calculate length of top normal from top intercept to base
+        self.dist = thick * np.cos(dip) / np.cos(ang)
+        # calculate construction points along the top normal
+        normal = -1. * np.sin(topdip) + 1j * np.cos(topdip)
+        self.zero = NULL + 1j * topdepth
+        self.cross = self.zero + self.dist * normal
+        self.newcross = self.zero + self.gfac * self.dist * normal
+        # transform of each layer: rotate and stretch about the cross point,
+        # then move to the new cross point
+        amp = self.velfac * np.exp(1j * self.rot)
+        shift = self.newcross - amp * self.cross
+        # compose transforms of all layers above and the current one
+        self.amp = np.cumprod(amp)
+        self.shift = np.cumsum(self.above(value=self.amp, neutral=1.) * shift)
         # return
         return self
 
-    def setup(self, stack=None):
+    @staticmethod
+    def above(value=None, neutral=None):
         """
-        Define all stretch-involved parameters.
+        Shift a composed transform by one layer downwards.
 
         Parameters
         ----------
-        stack : Stack
-            original stack of layers
+        value : np.array of complex
+            composed amp or shift including the current layer
+        neutral : float
+            neutral value at the surface: 1 for amp, 0 for shift
 
         Returns
         -------
-        self : StackAux
-            gfac : float
-                stretch factor
-            rot : float
-                incremental rotation
-            velfac : float
-                velocity factor
+        value : np.array of complex
+            composed amp or shift of all layers above the current one
 
         """
-        # calculate stretch term
-        self.gfac = np.sqrt(1. + stack[self.iii].ggg)
-        # calculate additive base rotation
-        self.rot = (
-            np.arctan(self.gfac * np.tan(stack[self.iii].ang))
-            -
-            stack[self.iii].ang)
-        # calculate multiplicative velocity increase
-        self.velfac = (
-            np.sqrt(
-                1. + stack[self.iii].ggg * np.sin(stack[self.iii].ang) ** 2))
         # return
-        return self
+        return np.concatenate(([neutral], value[:-1]))
 
 
 class Stacks(dict):
     """
     Describe a stack of layers and modify their properties.
 
-    The stack of layer is described as a list subclass, and the functions as
-    methods of that subclass.
+    The stack of layer is described as a Stack of layer records, and the
+    functions as methods of a dict of Stacks.
 
     """
 
@@ -780,14 +1183,10 @@ class Stacks(dict):
             stack in original state, plus vertical depth
 
         """
-        # loop through all layers in stack
-        for layer in stack:
-            # zero out stretch factor
-            layer.ggg = 0.0
+        # zero out stretch factor in all layers
+        stack.data['ggg'] = 0.0
         # depth of layers in stack
-        for iii in range(stack.nos):
-            stack[iii].depth = np.sum(
-                [stack[jjj].thick for jjj in range(iii+1)])
+        stack.data['depth'] = np.cumsum(stack.data['thick'])
         # return
         return stack
 
@@ -796,6 +1195,11 @@ class Stacks(dict):
         """
         Work on the stack in the stretched state only.
 
+        Stretching a layer along its top normal rotates its base and all layers
+        underneath, and increases the reference velocity underneath; see
+        StackAux.setup for the transforms composed over all layers. All
+        layers are computed at once with array operations.
+
         For the rotation of a line around a point see
         https://math.stackexchange.com/questions/1064832/rotate-a-line-by-a-given-angle-about-a-point
 
@@ -813,31 +1217,16 @@ class Stacks(dict):
 
         """
 
-        # pylint: disable=too-many-statements
-
-        def _open(newstack=None):
-            """
-            Update opening angle.
-
-            Returns
-            -------
-            newstack : Stack
-                ang : list of float or nan, updated opening angle
-
-            """
-            # calculate opening angle
-            newstack[0].ang = newstack[0].dip
-            for iii in range(1, newstack.nos):
-                newstack[iii].ang = newstack[iii].dip - newstack[iii-1].dip
-            # return
-            return newstack
+        # pylint: disable=too-many-locals
 
-        def _stackprint(add="", layer=None, aux=None):
+        def _stackprint(add="", layer=None, aux=None, iii=None):
             """
             Print infos about the stack of layers
 
             Parameters
             ----------
+            add : str
+                addition to standard header
             layer : Layer
                 exactly that, a layer whose parameters are to be printed
             aux : StackAux
@@ -845,6 +1234,8 @@ class Stacks(dict):
                     gfac : stretch factor
                     rot : rotation
                     velfac : velocity factor
+            iii : int
+                index of layer
 
             Returns
             -------
@@ -853,10 +1244,10 @@ class Stacks(dict):
             """
             # call
             if STACKPRINT:
-                _stackprint1(add=add, layer=layer, aux=aux)
-                _stackprint2(layer=layer, aux=aux)
+                _stackprint1(add=add, layer=layer, aux=aux, iii=iii)
+                _stackprint2(layer=layer, aux=aux, iii=iii)
 
-        def _stackprint1(add=None, layer=None, aux=None):
+        def _stackprint1(add=None, layer=None, aux=None, iii=None):
             """
             Print additional layer information
 
@@ -868,6 +1259,8 @@ class Stacks(dict):
                 exactly that, one layer before / after stretch + rotation
             aux : StackAux
                 auxiliary
+            iii : int
+                index of layer
 
             Returns
             -------
@@ -880,10 +1273,11 @@ class Stacks(dict):
                 output += ", rotation={:+9.6f}"
                 output += ", factor={:8.6f}"
                 string = [
-                    layer.name, aux.gfac, np.rad2deg(aux.rot), aux.velfac]
+                    layer.name, aux.gfac[iii], np.rad2deg(aux.rot[iii]),
+                    aux.velfac[iii]]
                 print(output.format(*string))
 
-        def _stackprint2(layer=None, aux=None):
+        def _stackprint2(layer=None, aux=None, iii=None):
             """
             Print additional layer information.
 
@@ -897,6 +1291,8 @@ class Stacks(dict):
                 exactly that, one layer before / after stretch + rotation
             aux : StackAux
                 auxiliary
+            iii : int
+                index of layer
 
             Returns
             -------
@@ -905,7 +1301,7 @@ class Stacks(dict):
             """
             if STACKPRINT:
                 output = "h_norm={:11.6f}, h_vert={:11.6f}, dip={:9.6f}"
-                string = [aux.dist, layer.thick, np.rad2deg(layer.dip)]
+                string = [aux.dist[iii], layer.thick, np.rad2deg(layer.dip)]
                 print(output.format(*string))
 
         def _conpoint(zero=None, point=None, anno=None):
@@ -939,43 +1335,17 @@ class Stacks(dict):
             # show graphics
             plt.draw()
 
-        def _dip(stack=None, aux=None):
-            """
-            Calculate the dip of a normal.
-
-            """
-            # calculate dip
-            dip = sys.float_info.max
-            if aux.iii == 0:       # at the surface
-                dip = np.pi / 2.   # vertical down in (x,z) coordinate system
-            else:                  # all other interfaces
-                if stack[aux.iii-1].dip >= 0:                 # pos. face dip
-                    dip = stack[aux.iii-1].dip - np.pi / 2.   # up
-                else:                                         # neg. face dip
-                    dip = stack[aux.iii-1].dip + np.pi / 2.   # down
-            # check
-            assert \
-                np.abs(dip) <= +1. * np.pi / 2., \
-                "Stack._inside: check dip " + dip
-            # return
-            return dip
-
-        def _inside(stack=None, newstack=None, aux=None):
+        def _construct(stack=None, newstack=None, aux=None):
             """
-            Project vertical onto normal, stretch, and project back.
-
-            Note, do not rotate the normal vector. Inside the layer to be
-            stretched, the base rotation is subsequently defined; see paper.
+            Print and plot the construction of the stretched layers.
 
-            Lines are defined as y = m x + b, where m = tan(phi). E.g., insert
-            any point (x_0, z_0) and solve for intercept b. Or solve for the
-            cross point of two lines by equating m1 x + b1 = m2 x + b2 and
-            solve for x, then insert x into any one line.
+            The construction points are shown in the state just before
+            stretching the layer, that is after stretching all layers above.
 
             Parameters
             ----------
             stack : Stack
-                current stack of layers
+                original stack of layers
             newstack : Stack
                 stretched / rotated stack of layers
             aux : StackAux
@@ -983,253 +1353,105 @@ class Stacks(dict):
 
             Returns
             -------
-            newstack: Stack
-                stretched / rotated stack of layers with correct depth
-
-            """
+            none
 
-            # pylint:disable=too-many-locals
-
-            # (1) define  zero point = intercept of top
-            zzz1 = 0. if aux.iii == 0 else stack[aux.iii-1].depth
-            zero = \
-                Point(xxx0=NULL, zzz0=zzz1).\
-                printout(title="top intercept")
-            if CONSTPLOT[aux.iii]:
-                _conpoint(point=zero, anno="top intercept")
-            # (2) define a line normal to top (not yet a normal vector)
-            dip1 = _dip(stack=stack, aux=aux)
-            line1 = Line(dip=dip1, point=zero)
-            # (3) define base
-            zzz2 = stack[aux.iii].depth
-            intercept = \
-                Point(xxx0=NULL, zzz0=zzz2).\
-                printout(title="base intercept")
-            if CONSTPLOT[aux.iii]:
-                _conpoint(point=intercept, anno="base intercept")
-            dip2 = stack[aux.iii].dip
-            line2 = Line(dip=dip2, point=intercept)
-            # (4) calculate crossing point of top normal and base
-            cross = \
-                Point().cross(line1=line1, line2=line2).\
-                printout(title="base cross")
-            if CONSTPLOT[aux.iii]:
-                _conpoint(point=cross, anno="base cross")
-            # preserve crossing point for layers below
-            stack[aux.iii].cross = cp(cross)
-            # (5) define a normal vector
-            normal = Vector(foot=zero, head=cross)
-            if CONSTPLOT[aux.iii]:
-                _conline(point1=zero, point2=cross)
-            # (6) stretch normal vector
-            normal.stretch(fac=aux.gfac)
-            newcross = normal.head
-            normal.head.\
-                printout(title="new base cross")
-            if CONSTPLOT[aux.iii]:
-                _conpoint(point=newcross, anno="new base cross")
-                _conline(point1=cross, point2=newcross)
-            # preserve new crossing point
-            newstack[aux.iii].cross = cp(newcross)
-            # (7) project normal vector onto vertical
-            dip7 = newstack[aux.iii].dip                # new dip of base
-            line7 = Line(dip=dip7, point=newcross)
-            newintercept = Point(xxx0=NULL, zzz0=line7.bbb).\
-                printout(title="new base intercept")
-            if CONSTPLOT[aux.iii]:
-                _conpoint(point=newintercept, anno="new base intercept")
-            # preserve new intercept as depth, calculate thickness
-            newstack[aux.iii].depth = newintercept.zzz
-            newstack[aux.iii].thick = \
-                newstack[aux.iii].depth if aux.iii == 0 \
-                else newstack[aux.iii].depth - stack[aux.iii-1].depth
-            # extract new depth and return
-            return stack, newstack
-
-        def _below(stack=None, newstack=None, aux=None):
             """
-            Project vertical onto normal, stretch, rotate and project back.
+            # transforms of all layers above
+            amp = StackAux.above(value=aux.amp, neutral=1.)
+            shift = StackAux.above(value=aux.shift, neutral=0.)
+            # loop through all stretched layers
+            for iii, layer in enumerate(stack):
+                if layer.ggg == 0.:   # no need to do anything otherwise
+                    continue
+                # print additional infos
+                _stackprint(
+                    add=" before stretching", layer=layer, aux=aux, iii=iii)
+                # construction points in the state before stretching
+                value = {
+                    "top intercept": aux.zero[iii],
+                    "base cross": aux.cross[iii],
+                    "new base cross": aux.newcross[iii]}
+                value = {
+                    title: amp[iii] * value[title] + shift[iii]
+                    for title in value}
+                value["new base intercept"] = NULL + 1j * newstack[iii].depth
+                # print / plot construction points
+                plot = iii < len(CONSTPLOT) and CONSTPLOT[iii]
+                point = {}
+                for title in value:
+                    point[title] = \
+                        Point(xxx0=value[title].real, zzz0=value[title].imag).\
+                        printout(title=title)
+                    if plot:
+                        _conpoint(point=point[title], anno=title)
+                if plot:
+                    _conline(
+                        point1=point["top intercept"],
+                        point2=point["base cross"])
+                    _conline(
+                        point1=point["base cross"],
+                        point2=point["new base cross"])
+                # print additional infos
+                _stackprint(
+                    add=" after stretching", layer=newstack[iii], aux=aux,
+                    iii=iii)
+
+        # extract layer parameters
+        dip = stack.data['dip']
+        tilt = stack.data['tilt']
+        depth = stack.data['depth']
+        vvv0 = stack.data['vvv0']
+        # set up stretch-involved parameters of all layers
+        aux = StackAux().setup(stack=stack)
+        # compose rotations of all layers above and the current one
+        rot = np.cumsum(aux.rot)
+        # apply base rotation (eq. 7)
+        dip = dip + rot
+        # rotate symmetry tilt of all layers below a stretched one
+        tilt = tilt - (rot - aux.rot)
+        # stretch reference velocity of all layers below a stretched one
+        vvv0 = vvv0 * np.abs(StackAux.above(value=aux.amp, neutral=1.))
+        # transform the intercept of each base with the vertical, and project
+        # back onto the vertical along the new dip
+        point = aux.amp * (NULL + 1j * depth) + aux.shift
+        depth = point.imag + np.tan(dip) * (NULL - point.real)
+        # preserve original stack for printing / plotting only
+        construct = STACKPRINT or CROSSPRINT or any(CONSTPLOT)
+        oldstack = cp(stack) if construct else None
+        # update stack
+        # note, stack has been copied already
+        newstack = stack
+        newstack.data['dip'] = dip
+        newstack.data['tilt'] = tilt
+        newstack.data['depth'] = depth
+        newstack.data['vvv0'] = vvv0
+        # calculate thickness and opening angle
+        newstack.data['thick'] = np.diff(depth, prepend=0.)
+        newstack.data['ang'] = np.diff(dip, prepend=0.)
+        # print / plot construction
+        if construct:
+            _construct(stack=oldstack, newstack=newstack, aux=aux)
+        # return
+        return newstack
 
-            Lines are defined as y = m x + b, where m = tan(phi). E.g., insert
-            any point (x_0, z_0) and solve for intercept b. Or solve for the
-            cross point of two lines by equating m1 x + b1 = m2 x + b2 and
-            solve for x, then insert x into any one line.
+    # dict subclass allowing to add methods to an otherwise built-in type
+    # http://igorsobreira.com/2011/02/06/adding-methods-dynamically-in-python.html
+    def __init__(self, stack=None, graph=None):
+        """
+        Subclass a dict containing a stack of layers for each state.
 
-            Parameters
-            ----------
-            stack : Stack
-                current stack of layers
-            newstack : Stack
-                stretched / rotated stack of layers
-            aux : StackAux
-                auxiliary
-
-            Returns
-            -------
-            newstack: Stack
-                stretched / rotated stack of layers with correct depth
-
-            """
-
-            # pylint:disable=too-many-locals
-
-            # (1) define a top normal relative to the cross point on the base
-            # of the layer above
-            # note, the dip is determined by the stretch axis in the layer
-            # undergoing stretching above.
-            oldzero = \
-                stack[aux.iii].cross .\
-                printout(title="old top cross")
-            dip1 = stack[aux.iii].dip - np.pi / 2.   # dip in the layer above
-            line1 = Line(dip=dip1, point=oldzero)
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=oldzero, anno="old top cross")
-            # (2) define base
-            # note, the depth of that base is stack[i].depth at the vertical
-            zzz2 = stack[aux.jjj].depth
-            intercept = \
-                Point(xxx0=NULL, zzz0=zzz2).\
-                printout(title="base intercept")
-            dip2 = stack[aux.jjj].dip
-            line2 = Line(dip=dip2, point=intercept)
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=intercept, anno="base intercept")
-            # (3) calculate the cross point of top normal and base
-            cross = \
-                Point().\
-                cross(line1=line1, line2=line2).\
-                printout(title="base cross")
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=cross, anno="base cross")
-            # (4) define a normal vector
-            normal = Vector(foot=oldzero, head=cross)
-            if CONSTPLOT[aux.jjj]:
-                _conline(point1=oldzero, point2=cross)
-            # (5) rotate the normal vector
-            normal.rotate(angle=aux.rot)
-            rotatecross = normal.head
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=rotatecross, anno="rotated base cross")
-            # (6) stretch the normal vector
-            normal.stretch(fac=aux.velfac)
-            newstretch = normal.head.\
-                printout(title="stretched base cross")
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=newstretch, anno="stretched base cross")
-            # (7) attach to new top cross
-            newzero = newstack[aux.iii].cross
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=newzero, anno="new top zero")
-            normal.move(fro=stack[aux.iii].cross, too=newzero)
-            # (8) project the normal vector back onto the vertical
-            # note, the headpoint of the normal vector is along the new base
-            dip7 = newstack[aux.jjj].dip
-            line7 = Line(dip=dip7, point=normal.head)
-            newintercept = Point(xxx0=NULL, zzz0=line7.bbb).\
-                printout(title="new base intercept")
-            if CONSTPLOT[aux.jjj]:
-                _conpoint(point=newintercept, anno="new base intercept")
-            # extract new depth
-            newstack[aux.jjj].depth = newintercept.zzz
-            # return
-            return newstack
-
-        def _execute(stack=None, aux=None, graph=None):
-            """
-            Execute the stretching of a layer and updating of layers below.
-
-            Parameters
-            ----------
-            stack : Stack
-                original stack of layers
-            graph : Graphics
-                graphics
-            aux : StackAux
-                auxiliary variables
-
-            Returns
-            -------
-            newstack : Stack
-                stack of stretched / updated layers
-
-            """
-            # reset auxiliary variables
-            aux.inside()
-            # copy stack
-            # note, newstack contains the parameters of the stretched stack,
-            # but all calculations below are still done with the parameters of
-            # the current stack
-            newstack = cp(stack)   # copy!
-            # print additional infos
-            _stackprint(
-                add=" before stretching", layer=newstack[aux.iii], aux=aux)
-            # set up all stretch-involved parameters
-            aux.setup(stack=stack)
-            # apply base rotation (eq. 7)
-            newstack[aux.iii].dip = stack[aux.iii].dip + aux.rot
-            # calculate cross points, depth and thickness
-            stack, newstack = _inside(stack=stack, newstack=newstack, aux=aux)
-            # print additional infos
-            _stackprint(
-                add=" after stretching", layer=newstack[aux.iii], aux=aux)
-            # loop through all layers in stack below the current layer
-            for aux.jjj in range(aux.iii+1, stack.nos):
-                # set auxiliary variable to that below a stretched layer
-                aux.below()
-                # print additional infos
-                _stackprint(
-                    add=" before updating", layer=stack[aux.jjj], aux=aux)
-                # rotate base dip
-                newstack[aux.jjj].dip = stack[aux.jjj].dip + aux.rot
-                # rotate symmetry tilt
-                newstack[aux.jjj].tilt = stack[aux.jjj].tilt - aux.rot
-                # stretch reference velocity
-                newstack[aux.jjj].vvv0 = stack[aux.jjj].vvv0 * aux.velfac
-                # calculate layer thickness
-                newstack = _below(stack=stack, newstack=newstack, aux=aux)
-                # re-calculate depth of base
-                newstack[aux.jjj].thick = \
-                    newstack[aux.jjj].depth - newstack[aux.jjj-1].depth
-                # print additional infos
-                _stackprint(
-                    add=" after updating", layer=newstack[aux.jjj],
-                    aux=aux)
-            # copy back into stack
-            newstack = _open(newstack=newstack)
-            # return
-            return newstack
-
-        # initialize auxiliary variables
-        aux = StackAux()   # reset for each run through stack
-        # loop through all layers in stack
-        for aux.iii in range(stack.nos):
-            if stack[aux.iii].ggg != 0.:   # no need to do anything otherwise
-                # call the stretch process
-                stack = _execute(stack=stack, aux=aux, graph=graph)
-            # note, stretching based on parameters of layer iii now completed
-        # return
-        return stack
-
-    # create multiple objects of type Layer and list them
-    # https://stackoverflow.com/questions/14600620/creating-multiple-objects-within-the-same-class-in-python
-    # list subclass allowing to add methods to an otherwise built-in type
-    # http://igorsobreira.com/2011/02/06/adding-methods-dynamically-in-python.html
-    def __init__(self, stack=None, graph=None):
-        """
-        Subclass a list containing a stack of layers.
-
-        Parameters
-        ----------
-        stack : Stack
-            list of layers
-        graph : Graphics
-            graphics
+        Parameters
+        ----------
+        stack : Stack
+            list of layers
+        graph : Graphics
+            graphics
 
         Instance
         --------
         self{demo}.stack
             demo : one of original or stretched state
-            stack : a list of layers in either original or stretched state
+            stack : a Stack of layers in either original or stretched state
 
         Returns
         -------
@@ -1332,6 +1554,8 @@ class Para():
 
     # pylint: disable=too-few-public-methods
 
+    __slots__ = tuple(PARAMETERLIST)
+
     def __init__(self, layer=None):
         """
         Extract velocity parameters from layer information.
@@ -1359,6 +1583,8 @@ class Face():
 
     # pylint: disable=too-few-public-methods
 
+    __slots__ = tuple(FACELIST)
+
     def __init__(self, layer=None):
         """
         Extract the interface parameters from layer information.
@@ -1410,7 +1636,7 @@ class Path():
         # extract number of layers in path
         self.nos = len(path)
         # extract available layer names in stack
-        name = [layer.name for layer in stack]
+        name = [stack.names[iii] for iii in stack.data['id']]
         # index path layers by correlating path names with layer names
         self.index = [name.index(path[iii]) for iii in range(self.nos)]
         # extract properties
@@ -1428,15 +1654,15 @@ class Path():
         # (base interface is defined in layer: so, base interface is in current
         # layer = current layer index, and top interface is base interface of
         # layer above = current layer index - 1)
+        # note, Face copies scalars only
         self.face = [
             Face(
-                layer=cp(
-                    stack[
-                        self.index[iii] if self.direct[iii] == 'down'
-                        else self.index[iii]-1]))
+                layer=stack[
+                    self.index[iii] if self.direct[iii] == 'down'
+                    else self.index[iii]-1])
             for iii in range(self.nos-1)]
         # add surface
-        self.face += [Face(layer=cp(surface))]
+        self.face += [Face(layer=surface)]
 
     def info(self):
         """
@@ -1693,10 +1919,10 @@ class SegmentAux():
             next x-, z-coordinate and length of ray
         time : list of float or nan
             traveltime along ray
-        para : list of int
-            list of parallel rays
-        back : list of int
-            list of anti-parallel ("behind") rays
+        para : np.array of bool
+            T for parallel rays
+        back : np.array of bool
+            T for anti-parallel ("behind") rays
 
         Returns
         -------
@@ -1707,9 +1933,9 @@ class SegmentAux():
         self.zzz = None
         self.length = None
         self.time = None
-        # list of parallel rays
+        # flag parallel rays
         self.para = None
-        # list of anti-parallel ("behind") rays
+        # flag anti-parallel ("behind") rays
         self.back = None
 
 
@@ -1744,8 +1970,13 @@ class Front():
             traveltime
         done : bool
             T / F for final wavefront point calculated / not yet calculated
+        before : bool
+            T for final wavefront point calculated before the latest leg
         nos : int
             number of wavefront points
+        npara, nback : int
+            number of rays parallel to an interface / with the interface
+            behind, summed over all segments (diagnostics only)
 
         Returns
         -------
@@ -1758,7 +1989,30 @@ class Front():
         self.xxx = np.array([source.xxx] * source.nos)
         self.zzz = np.array([source.zzz] * source.nos)
         self.time = np.array([source.time] * source.nos)
+        self.done = np.full(source.nos, False, dtype=bool)
+        self.before = np.full(source.nos, False, dtype=bool)
         self.nos = source.nos
+        self.npara = 0
+        self.nback = 0
+
+    def latest(self):
+        """
+        Get the wavefront points of the latest leg.
+
+        Wavefront points completed in an earlier leg are kept for resampling,
+        but are nan'ed here, as they would be plotted, printed or exported
+        once for each later leg otherwise.
+
+        Returns
+        -------
+        xxx, zzz, time : np.array of float or nan
+            copies of the coordinates and traveltime
+
+        """
+        # return with points completed before nan'ed
+        return tuple(
+            np.where(self.before, np.nan, getattr(self, attr))
+            for attr in ['xxx', 'zzz', 'time'])
 
     def _rayprint(self, segment, energy):
         """
@@ -1860,8 +2114,8 @@ class Front():
 
             Returns
             -------
-            back : list of int
-                indices with cross points behind in ray segment
+            back : np.array of bool
+                T / F for cross points behind / ahead in ray segment
 
             """
             # calculate ray angle
@@ -1870,9 +2124,6 @@ class Front():
             # note, theoretically, 0deg, but +/- 180deg if "behind"
             checkangle = np.abs(np.abs(checkangle - energy.angle) - np.pi)
             back = checkangle < np.pi / 123.   # close to 0deg if behind
-            # convert T/F into a list of indices where T
-            back = np.where(back[True])
-            back = list(itertools.chain.from_iterable(back))
             # return
             return back
 
@@ -1887,8 +2138,8 @@ class Front():
 
             Parameters
             ----------
-            where : list of int
-                indices at which x-, z-coordinates are at a fake large distance
+            where : np.array of bool
+                T for x-, z-coordinates to be at a fake large distance
             segment : SegmentAux
                 ray in current segment
 
@@ -1939,7 +2190,7 @@ class Front():
             # calculate horizontal component + check for ray being parallel to
             # the interface
             # note, parallel implies num/denom going through infinity
-            with np.errstate(divide='ignore', over='raise'):   # catch numerics
+            with numerics(divide='ignore', over='raise'):   # catch numerics
                 try:
                     # calculate horizontal component as numerator / denominator
                     # and assign np.inf if denominator is zero
@@ -1954,12 +2205,9 @@ class Front():
                         np.sqrt(
                             segment.xxx * segment.xxx
                             + segment.zzz * segment.zzz)
-                    # find all indices with xxx=np.inf's
+                    # flag all xxx=np.inf's
                     # note, np.Inf from above and numerical overflows
-                    segment.para = np.where(np.abs(segment.xxx) == np.inf)
-                    # flatten to a single list
-                    segment.para = \
-                        list(itertools.chain.from_iterable(segment.para))
+                    segment.para = np.isinf(segment.xxx)
                     # replace the horizontal component with something large
                     # along the ray
                     segment = _faraway(where=segment.para, segment=segment)
@@ -1973,9 +2221,10 @@ class Front():
                     print("\nFront.crosspoint: unexpected overflow!!!")
                     raise AssertionError(overflow) from overflow
                 # verify no np.Inf left
-                assert \
-                    np.logical_not(np.any(np.isinf(np.abs(segment.zzz)))), \
-                    "Front.crosspoint: infinity!!!"
+                check(
+                    test=lambda index: np.isfinite(segment.zzz[index])
+                    | np.isnan(segment.zzz[index]),
+                    nos=self.nos, text="Front.crosspoint: infinity!!!")
             # check orientation of ray ("behind")
             # note, "behind" means the ray from the foot point to the cross
             # point is in opposite direction to the energy ray
@@ -2028,6 +2277,8 @@ class Front():
             """
             Add segment to the entire path (called front historically)-
 
+            Note, wavefront points completed in an earlier segment are kept.
+
             Parameters
             ----------
             segment : Segment
@@ -2038,11 +2289,43 @@ class Front():
             none
 
             """
+            # keep completed wavefront points
+            todo = np.logical_not(self.done)
             # add segment distance to total coordinates
-            self.xxx += segment.xxx
-            self.zzz += segment.zzz
+            self.xxx[todo] += segment.xxx[todo]
+            self.zzz[todo] += segment.zzz[todo]
             # add traveltime along segment to total traveltime
-            self.time += segment.time
+            self.time[todo] += segment.time[todo]
+
+        def _valid(cntl=None):
+            """
+            Check the front once per segment.
+
+            Note, replaces trapping floating-point errors in production mode.
+
+            Parameters
+            ----------
+            cntl : Control
+                parameters controlling the simulation
+
+            Raises
+            ------
+            AssertionError
+                ray not completed but without finite coordinates or time
+
+            Returns
+            -------
+            none
+
+            """
+            # rays to be continued
+            todo = np.logical_not(cntl.done)
+            # check
+            assert \
+                np.all(np.isfinite(self.xxx[todo])) \
+                and np.all(np.isfinite(self.zzz[todo])) \
+                and np.all(np.isfinite(self.time[todo])), \
+                "Front.crosspoint: invalid front!"
 
         def _edge(cntl=None):
             """
@@ -2071,6 +2354,30 @@ class Front():
             # return
             return cntl
 
+        def _farprint(segment=None):
+            """
+            Count and print the rays not crossing the interface ahead.
+
+            Parameters
+            ----------
+            segment : SegmentAux
+                segment properties
+
+            Returns
+            -------
+            none
+
+            """
+            # count
+            npara = np.count_nonzero(segment.para)
+            nback = np.count_nonzero(segment.back)
+            self.npara += npara
+            self.nback += nback
+            # check flag
+            if FARPRINT:
+                output = "\nrays parallel to {:s}: {:d}, behind: {:d}"
+                print(output.format(top.name, npara, nback))
+
         def _segmentprint(segment=None):
             """
             Print information about the ray within a segment.
@@ -2104,6 +2411,8 @@ class Front():
         cose = np.cos(energy.angle)
         # calculate next cross point of the ray with the next interface
         segment = _formula(segment=segment, energy=energy, top=top)
+        # count parallel and "behind" rays
+        _farprint(segment=segment)
         # calculate fraction of ray within segment
         segment, frag = _fraction(cntl=cntl, segment=segment)
         # print segment information
@@ -2122,6 +2431,11 @@ class Front():
             plt.draw()
         # add segment to front
         _add(segment=segment)
+        # flag completed wavefront points, keeping those completed before
+        self.before = self.done.copy()
+        self.done[frag < 1.] = True
+        # check front
+        _valid(cntl=cntl)
         # print if RAYPRINT true
         self._rayprint(segment, energy)
         # check edge of graphics
@@ -2130,88 +2444,595 @@ class Front():
         return self, cntl
 
 
-class Fronts(dict):
+class Fronts(dict):
+    """
+    A dict of Front's, one for each element in DEMO.
+
+    """
+
+    # dict subclass allowing to add methods to an otherwise built-in type
+    # http://igorsobreira.com/2011/02/06/adding-methods-dynamically-in-python.html
+    def __init__(self, cntl=None, source=None):
+        """
+        List coordinates of wavefronts.
+
+        Parameters
+        ----------
+        cntl : Control
+            parameters controlling the simulation
+        source : Source
+            source
+
+        Instances
+        ---------
+        self{<demo>: <front>}
+            a dict of front, one for each demo
+
+        Returns
+        -------
+        none
+
+        """
+        # create individual fronts for each state
+        fronts = {
+            demo:
+                Front(
+                    source=source,
+                    color=LINECOLOR[cntl.itim], dashes=LINEDASHES[demo])
+            for demo in DEMO}
+        # inherit
+        super().__init__(fronts)   # now initializing self as dict subclass
+
+    @staticmethod
+    def _hash():
+        """
+        Hash the model, that is stack, surface, travelpath and source.
+
+        Returns
+        -------
+        str
+            hexadecimal SHA-256 hash
+
+        """
+        # serialize the model
+        model = \
+            json.dumps(
+                [STACK, SURFACE, PATH, SOURCE], sort_keys=True, default=str)
+        # return
+        return hashlib.sha256(model.encode()).hexdigest()
+
+    def save(self, file=None, cntl=None):
+        """
+        Save the wavefronts into a binary file with a JSON header.
+
+        Parameters
+        ----------
+        file : str
+            file name
+        cntl : Control
+            parameters controlling the simulation
+
+        Returns
+        -------
+        self : Fronts
+            saved, but unchanged
+
+        """
+        # collect arrays of the latest leg
+        arrays = {}
+        for demo in DEMO:
+            latest = dict(zip(['xxx', 'zzz', 'time'], self[demo].latest()))
+            latest['done'] = \
+                self[demo].done & np.logical_not(self[demo].before)
+            arrays.update({
+                f"{demo}/{attr}": array for attr, array in latest.items()})
+        # lay out arrays behind the header, aligned
+        # note, the header is estimated generously for its own offsets
+        header = {
+            'demo': list(DEMO), 'time': cntl.time, 'model': self._hash(),
+            'nos': self[DEMO[0]].nos, 'arrays': {}}
+        size = len(json.dumps(header))
+        size += sum(len(name) + 96 for name in arrays)
+        offset = FRONTALIGN * (size // FRONTALIGN + 1)
+        for name, array in arrays.items():
+            header['arrays'][name] = {
+                'offset': offset, 'dtype': array.dtype.str,
+                'shape': list(array.shape)}
+            offset += FRONTALIGN * (array.nbytes // FRONTALIGN + 1)
+        # write header, padded up to the first array, and arrays
+        text = json.dumps(header).encode() + b'\n'
+        assert \
+            len(text) <= header['arrays'][next(iter(arrays))]['offset'], \
+            "Fronts.save: header too long!"
+        with open(file, 'wb') as output:
+            output.write(text)
+            for name, array in arrays.items():
+                output.seek(header['arrays'][name]['offset'])
+                array.tofile(output)
+        # return
+        return self
+
+    @staticmethod
+    def load(file=None):
+        """
+        Map the wavefronts saved by Fronts.save lazily into memory.
+
+        Parameters
+        ----------
+        file : str
+            file name
+
+        Returns
+        -------
+        header : dict
+            demo, time, model hash, number of rays and array layout
+        arrays : dict of np.memmap
+            read-only arrays keyed by "<demo>/<attribute>"
+
+        """
+        # read header
+        with open(file, 'rb') as infile:
+            header = json.loads(infile.readline())
+        # map arrays
+        arrays = {
+            name: np.memmap(
+                file, mode='r', offset=layout['offset'],
+                dtype=np.dtype(layout['dtype']), shape=tuple(layout['shape']))
+            for name, layout in header['arrays'].items()}
+        # return
+        return header, arrays
+
+    def info(self, cntl=None):
+        """
+        Print wavefront coordinates.
+
+        Parameters
+        ----------
+        cntl : Control
+            parameters controlling the simulation
+        Returns
+        -------
+        self : Fronts
+            report, but unchanged
+
+        """
+        # check switch
+        if FRONTPRINT:
+            # number of digits in nos
+            width = int(np.log10(self['original'].nos)) + 1
+            # print title
+            print('\nwavefront:')
+            # print header
+            header = ' ' * width          # index
+            header += ' ' * 12 + 'x'      # x coordinates
+            header += ' ' * 22 + 'z'      # z coordinates
+            header += ' ' * 18 + 'time'   # traveltimes
+            print(header)
+            # format for data output
+            output = f"{{:{width}d}}"           # index
+            output += "   {:+9.3f}, {:+9.3f}"   # x coordinates
+            output += "   {:+9.3f}, {:+9.3f}"   # z coordinates
+            output += "    {:5.3f}, {:5.3f}"    # traveltimes
+            # wavefront points of the latest leg
+            oxxx, ozzz, otime = self['original'].latest()
+            sxxx, szzz, stime = self['stretch'].latest()
+            # loop through all sets of coordinates and traveltimes
+            for index in range(self['original'].nos):
+                if cntl.done[index]:
+                    numbers = (
+                        index,
+                        float(oxxx[index]), float(sxxx[index]),
+                        float(ozzz[index]), float(szzz[index]),
+                        float(otime[index]), float(stime[index]))
+                    print(output.format(*numbers))
+        # return
+        return self
+
+
+class Sample():
+    """
+    Describe a wavefront resampled at uniform arc length.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('xxx', 'zzz', 'time', 'nos', 'color', 'dashes')
+
+    def __init__(self, front=None, spacing=None):
+        """
+        Resample a wavefront at a uniform arc length.
+
+        Only completed wavefront points inside the graphics window are used,
+        and the wavefront is split into pieces wherever neighbouring rays are
+        not; each piece is resampled at equal arc lengths no longer than
+        spacing, including both its ends. So, the number of samples depends
+        on the length of the wavefront inside the window, not on the number of
+        rays.
+
+        Parameters
+        ----------
+        front : Front
+            wavefront with one point per ray
+        spacing : float
+            maximum arc length between samples
+
+        Instances
+        ---------
+        xxx, zzz : np.array of float or nan
+            horizontal and vertical component of a sample, with nan between
+            pieces
+        time : np.array of float or nan
+            traveltime
+        nos : int
+            number of samples including nan's
+        color : str
+            Matplotlib color as in front
+        dashes : str
+            Matplotlib dashes as in front
+
+        Returns
+        -------
+        none
+
+        """
+        # check
+        assert spacing > 0., f"Sample.__init__: spacing {spacing} !> 0"
+        # copy graphics
+        self.color = front.color
+        self.dashes = front.dashes
+        # select completed wavefront points inside graphics window
+        # note, comparisons with nan are false
+        index = np.flatnonzero(
+            front.done
+            & (front.xxx >= GRAPHICS['xmin'])
+            & (front.xxx <= GRAPHICS['xmax'])
+            & (front.zzz >= GRAPHICS['zmin'])
+            & (front.zzz <= GRAPHICS['zmax']))
+        xxx = front.xxx[index]
+        zzz = front.zzz[index]
+        time = front.time[index]
+        # flag the first and last point of each piece
+        first = np.diff(index, prepend=-2) > 1
+        last = np.diff(index, append=len(front.done) + 1) > 1
+        # calculate arc length, with a gap of one spacing between pieces to
+        # keep the arc length increasing from one piece to the next
+        arc = np.full(len(index), spacing)
+        arc[1:] = np.hypot(np.diff(xxx), np.diff(zzz))
+        arc[first] = spacing
+        arc = np.cumsum(arc)
+        # arc length at the start and length of each piece
+        start = arc[first]
+        length = arc[last] - start
+        # number of samples in each piece, including both ends
+        num = np.ceil(length / spacing).astype(int) + 1
+        # arc length of all samples
+        piece = np.repeat(np.arange(len(num)), num)
+        count = np.arange(np.sum(num)) - np.repeat(np.cumsum(num) - num, num)
+        step = length / np.maximum(num - 1, 1)
+        arcsample = start[piece] + count * step[piece]
+        # interpolate, and separate pieces by nan's
+        where = np.arange(len(arcsample)) + piece
+        self.nos = len(arcsample) + max(len(num) - 1, 0)
+        self.xxx = np.full(self.nos, np.nan)
+        self.zzz = np.full(self.nos, np.nan)
+        self.time = np.full(self.nos, np.nan)
+        if self.nos:
+            self.xxx[where] = np.interp(arcsample, arc, xxx)
+            self.zzz[where] = np.interp(arcsample, arc, zzz)
+            self.time[where] = np.interp(arcsample, arc, time)
+
+    def distance(self, other=None, chunk=2**22):
+        """
+        Compute the distance of each sample to another resampled wavefront.
+
+        The distance is measured to the nearest line segment between
+        successive samples of the other wavefront.
+
+        Parameters
+        ----------
+        other : Sample
+            another resampled wavefront
+        chunk : int
+            maximum number of sample-segment pairs computed at once
+
+        Returns
+        -------
+        dist : np.array of float
+            distance of each sample, which is not nan, to other
+
+        """
+        # samples
+        point = (self.xxx + 1j * self.zzz)[np.logical_not(np.isnan(self.xxx))]
+        # line segments of the other wavefront
+        foot = other.xxx[:-1] + 1j * other.zzz[:-1]
+        head = other.xxx[1:] + 1j * other.zzz[1:]
+        keep = np.logical_not(np.isnan(foot) | np.isnan(head))
+        foot = foot[keep]
+        head = head[keep]
+        # isolated samples of the other wavefront as segments of zero length
+        alone = (other.xxx + 1j * other.zzz)[
+            np.logical_not(np.isnan(other.xxx))
+            & np.isnan(np.append(np.nan, other.xxx[:-1]))
+            & np.isnan(np.append(other.xxx[1:], np.nan))]
+        foot = np.append(foot, alone)
+        head = np.append(head, alone)
+        # check
+        dist = np.full(len(point), np.inf)
+        if len(foot) == 0:
+            return dist
+        # project onto segments, limited to their ends
+        seg = head - foot
+        seg2 = np.maximum(np.abs(seg) ** 2, np.finfo(float).tiny)
+        parts = max(1, len(point) * len(foot) // chunk)
+        for part in np.array_split(np.arange(len(point)), parts):
+            rel = point[part, np.newaxis] - foot
+            frac = np.clip((rel * np.conj(seg)).real / seg2, 0., 1.)
+            dist[part] = np.min(np.abs(rel - frac * seg), axis=1)
+        # return
+        return dist
+
+
+class Samples(dict):
+    """
+    A dict of Sample's, one for each element in DEMO.
+
+    """
+
+    def __init__(self, fronts=None, spacing=None):
+        """
+        Resample all wavefronts.
+
+        Parameters
+        ----------
+        fronts : Fronts
+            wavefronts with one point per ray
+        spacing : float
+            maximum arc length between samples
+
+        Returns
+        -------
+        none
+
+        """
+        # resample each wavefront
+        samples = {
+            demo: Sample(front=fronts[demo], spacing=spacing)
+            for demo in DEMO}
+        # inherit
+        super().__init__(samples)
+
+    def misfit(self):
+        """
+        Compute the misfit of the stretched and the original wavefront.
+
+        Misfit is the distance of the stretched samples to the original
+        wavefront.
+
+        Returns
+        -------
+        misfit : dict
+            rms : float
+                root mean square of distances
+            max : float
+                maximum distance
+            nos : int
+                number of stretched samples
+
+        """
+        # distance of stretched samples to original wavefront
+        dist = self['stretch'].distance(other=self['original'])
+        # return
+        return {
+            'rms': np.sqrt(np.mean(dist ** 2)) if len(dist) else np.nan,
+            'max': np.max(dist) if len(dist) else np.nan,
+            'nos': len(dist)}
+
+    def info(self, cntl=None):
+        """
+        Print the misfit of the stretched and the original wavefront.
+
+        Parameters
+        ----------
+        cntl : Control
+            parameters controlling the simulation
+
+        Returns
+        -------
+        self : Samples
+            report, but unchanged
+
+        """
+        # check switch
+        if MISFITPRINT:
+            # compute
+            misfit = self.misfit()
+            # print
+            output = "\nwavefront misfit at {:f}: rms={:f}, max={:f}"
+            output += " over {:d} samples"
+            string = [cntl.time, misfit['rms'], misfit['max'], misfit['nos']]
+            print(output.format(*string))
+        # return
+        return self
+
+
+class Arrival():
+    """
+    Describe the traveltimes of rays emerged at the surface.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('xxx', 'time', 'first', 'nos')
+
+    def __init__(self, front=None):
+        """
+        Collect the rays which completed the travelpath.
+
+        Rays completed the travelpath if not stopped by the traveltime and
+        not lost on the way, e.g. beyond a critical angle; they end at the
+        surface, see Path. Wherever neighbouring rays emerge in reverse order
+        of offset or not at all, the arrivals are split into pieces.
+
+        Parameters
+        ----------
+        front : Front
+            wavefront with one point per ray
+
+        Instances
+        ---------
+        xxx : np.array of float
+            offset at the surface
+        time : np.array of float
+            traveltime
+        first : np.array of bool
+            T for the first ray of each piece
+        nos : int
+            number of rays emerged
+
+        Returns
+        -------
+        none
+
+        """
+        # select rays emerged
+        index = \
+            np.flatnonzero(
+                np.logical_not(front.done) & np.isfinite(front.xxx))
+        self.xxx = front.xxx[index]
+        self.time = front.time[index]
+        self.nos = len(index)
+        # flag the first ray of each piece: after a gap, or a turn in offset
+        step = np.sign(np.diff(self.xxx))
+        self.first = np.diff(index, prepend=-2) > 1
+        self.first[2:] |= step[1:] != step[:-1]
+
+    def interp(self, grid=None):
+        """
+        Interpolate the first-arrival traveltime onto an offset grid.
+
+        Parameters
+        ----------
+        grid : np.array of float
+            increasing offsets
+
+        Returns
+        -------
+        time : np.array of float or nan
+            earliest traveltime of all pieces covering an offset, nan if none
+
+        """
+        # traveltime
+        time = np.full(len(grid), np.nan)
+        # interpolate piece by piece, keeping the earliest arrival
+        bound = np.append(np.flatnonzero(self.first), self.nos)
+        for start, stop in zip(bound[:-1], bound[1:]):
+            # skip single rays
+            if stop - start < 2:
+                continue
+            # sort into increasing offset
+            order = np.argsort(self.xxx[start:stop])
+            xxx = self.xxx[start:stop][order]
+            tmp = \
+                np.interp(
+                    grid, xxx, self.time[start:stop][order],
+                    left=np.nan, right=np.nan)
+            time = np.fmin(time, tmp)
+        # return
+        return time
+
+
+class Arrivals(dict):
     """
-    A dict of Front's, one for each element in DEMO.
+    A dict of Arrival's, one for each element in DEMO.
 
     """
 
-    # dict subclass allowing to add methods to an otherwise built-in type
-    # http://igorsobreira.com/2011/02/06/adding-methods-dynamically-in-python.html
-    def __init__(self, cntl=None, source=None):
+    def __init__(self, fronts=None, spacing=None):
         """
-        List coordinates of wavefronts.
+        Collect surface arrivals and set up a common offset grid.
 
         Parameters
         ----------
-        cntl : Control
-            parameters controlling the simulation
-        source : Source
-            source
+        fronts : Fronts
+            wavefronts with one point per ray
+        spacing : float
+            offset between grid points
 
         Instances
         ---------
-        self{<demo>: <front>}
-            a dict of front, one for each demo
+        self.grid : np.array of float
+            offsets covered by the arrivals of all states
 
         Returns
         -------
         none
 
         """
-        # create individual fronts for each state
-        fronts = {
-            demo:
-                Front(
-                    source=source,
-                    color=LINECOLOR[cntl.itim], dashes=LINEDASHES[demo])
-            for demo in DEMO}
+        # check
+        assert spacing > 0., f"Arrivals.__init__: spacing {spacing} !> 0"
+        # collect arrivals of each state
+        arrivals = {demo: Arrival(front=fronts[demo]) for demo in DEMO}
         # inherit
-        super().__init__(fronts)   # now initializing self as dict subclass
+        super().__init__(arrivals)
+        # offsets covered by all states
+        lower = max(np.min(self[demo].xxx, initial=+np.inf) for demo in DEMO)
+        upper = min(np.max(self[demo].xxx, initial=-np.inf) for demo in DEMO)
+        self.grid = \
+            np.arange(lower, upper + spacing / 2., spacing) \
+            if lower <= upper else np.array([])
+
+    def misfit(self):
+        """
+        Compute the misfit of the stretched and the original traveltimes.
+
+        Returns
+        -------
+        misfit : dict
+            rms : float
+                root mean square of traveltime differences
+            max : float
+                maximum absolute traveltime difference
+            nos : int
+                number of offsets compared
+
+        """
+        # difference of first arrivals where both states have one
+        diff = \
+            self['stretch'].interp(grid=self.grid) \
+            - self['original'].interp(grid=self.grid)
+        diff = np.abs(diff[np.logical_not(np.isnan(diff))])
+        # return
+        return {
+            'rms': np.sqrt(np.mean(diff ** 2)) if len(diff) else np.nan,
+            'max': np.max(diff) if len(diff) else np.nan,
+            'nos': len(diff)}
 
     def info(self, cntl=None):
         """
-        Print wavefront coordinates.
+        Print the misfit of the stretched and the original traveltimes.
 
         Parameters
         ----------
         cntl : Control
             parameters controlling the simulation
+
         Returns
         -------
-        self : Fronts
+        self : Arrivals
             report, but unchanged
 
         """
         # check switch
-        if FRONTPRINT:
-            # number of digits in nos
-            width = int(np.log10(self['original'].nos)) + 1
-            # print title
-            print('\nwavefront:')
-            # print header
-            header = ' ' * width          # index
-            header += ' ' * 12 + 'x'      # x coordinates
-            header += ' ' * 22 + 'z'      # z coordinates
-            header += ' ' * 18 + 'time'   # traveltimes
-            print(header)
-            # format for data output
-            output = f"{{:{width}d}}"           # index
-            output += "   {:+9.3f}, {:+9.3f}"   # x coordinates
-            output += "   {:+9.3f}, {:+9.3f}"   # z coordinates
-            output += "    {:5.3f}, {:5.3f}"    # traveltimes
-            # loop through all sets of coordinates and traveltimes
-            for index in range(self['original'].nos):
-                if cntl.done[index]:
-                    numbers = (
-                        index,
-                        float(self['original'].xxx[index]),
-                        float(self['stretch'].xxx[index]),
-                        float(self['original'].zzz[index]),
-                        float(self['stretch'].zzz[index]),
-                        float(self['original'].time[index]),
-                        float(self['stretch'].time[index]))
-                    print(output.format(*numbers))
+        if ARRIVALPRINT:
+            # compute
+            misfit = self.misfit()
+            # print
+            output = "\nsurface traveltime misfit at {:f}: rms={:f}, max={:f}"
+            output += " over {:d} offsets"
+            string = [cntl.time, misfit['rms'], misfit['max'], misfit['nos']]
+            print(output.format(*string))
         # return
         return self
 
@@ -2418,8 +3239,9 @@ class Phase(Vel):
 
         """
         # update
-        for attr in para.__dict__.keys():
-            setattr(self, attr, cp(getattr(para, attr)))
+        # note, parameters are scalars; so, no copy required
+        for attr in PARAMETERLIST:
+            setattr(self, attr, getattr(para, attr))
         # return
         return self
 
@@ -2626,6 +3448,65 @@ class Phase(Vel):
         # return
         return self
 
+    def _ellipse(self, cntl=None, slowxxx=None, base=None):
+        """
+        Solve Snell's law in closed form in an elliptical layer.
+
+        With rrr4 = 0, the stretched phase velocity is elliptical in the
+        stretched angle, v^2 = aaa + bbb sin^2(angle - sign * tilt), where
+        aaa = vvv0^2 (1 + ggg) and bbb = vvv0^2 (rrr2 - ggg). So, squaring
+        Snell's law p v = sin(angle + sign * dip) gives a linear equation in
+        cos and sin of the double incidence angle.
+
+        Parameters
+        ----------
+        cntl : Control
+            parameters controlling the simulation
+        slowxxx : np.array of float
+            slowness parallel to the interface
+        base : Face
+            interface the slowness is parallel to
+
+        Returns
+        -------
+        angle : np.array of float or nan
+            stretched phase angle; nan beyond the critical angle
+
+        """
+        # coefficients of the squared phase velocity
+        aaa = self.vvv0 * self.vvv0 * (1. + self.ggg)
+        bbb = self.vvv0 * self.vvv0 * (self.rrr2 - self.ggg)
+        # angle between symmetry axis and interface normal
+        ccc = cntl.sign * (base.dip + self.tilt)
+        # write p^2 v^2 = sin^2 as mag * cos(2 * incidence + shift) = rhs
+        pp2 = slowxxx * slowxxx
+        cose = 1. - pp2 * bbb * np.cos(2. * ccc)
+        sine = pp2 * bbb * np.sin(2. * ccc)
+        mag = np.hypot(cose, sine)
+        shift = np.arctan2(sine, cose)
+        rhs = 1. - 2. * pp2 * aaa - pp2 * bbb
+        # solve, giving nan beyond critical angle
+        with numerics(invalid='ignore'):
+            double = np.arccos(rhs / mag)
+        # pick the root of p v = sin, not of p v = -sin, within +/-90 degree
+        incidence = None
+        error = np.full_like(slowxxx, np.inf)
+        for root in [double - shift, -1. * double - shift]:
+            root = np.mod(0.5 * root + 0.5 * np.pi, np.pi) - 0.5 * np.pi
+            tmp = \
+                np.abs(
+                    slowxxx * np.sqrt(aaa + bbb * np.sin(root - ccc) ** 2)
+                    - np.sin(root))
+            incidence = \
+                root if incidence is None \
+                else np.where(tmp < error, root, incidence)
+            error = np.minimum(tmp, error)
+        incidence[np.logical_not(error <= MAXDSINE)] = np.nan
+        # rotate back into stretched phase angle
+        angle = incidence - cntl.sign * base.dip
+        # return
+        return angle
+
     def search(self, cntl=None, slow=None, base=None):
         """
         Searching for Snell's angle.
@@ -2654,8 +3535,10 @@ class Phase(Vel):
 
         # check monotenous increase
         def _monotoneous():
-            # differentiate angles
-            tmp = np.diff(self.angle)
+            # differentiate angles, all or a sample of them
+            index = sample(nos=self.nos - 1)
+            angle = self.angle[:-1][index]
+            tmp = self.angle[1:][index] - angle
             # check constant differential angles
             if np.any(tmp == 0.):
                 output = "\nconstant Snell's angles:"
@@ -2665,7 +3548,7 @@ class Phase(Vel):
                 where = np.where(tmp < 0.)
                 output = "\nnot monotonously increasing Snell's angles"
                 output += "\npossibly a triplication in the phase front"
-                output += "\n" + str(np.rad2deg(self.angle[where]))
+                output += "\n" + str(np.rad2deg(angle[where]))
                 raise AssertionError(output)
 
         # invert stretched angle to original angle:
@@ -2700,13 +3583,26 @@ class Phase(Vel):
             # return
             return angle0
 
+        # select live rays:
+        # note, rays completed, e.g. having left the graphics window, or
+        # beyond the critical angle carry nan; so, leave them out of search
+        live = np.logical_not(np.isnan(slow.xxx))
+        slowxxx = slow.xxx[live]
         # initialize auxiliary variable
-        aux = SearchAux(nos=slow.nos)
+        aux = SearchAux(nos=slowxxx.size)
         # initiate zero-offset incidence (or close to):
         # that is, set initial angle perpendicular to the interface, spread
         # over array, and set phase angle
         self.initangle(
-            ang=np.full_like(slow.xxx, -1. * cntl.sign * base.dip))
+            ang=np.full_like(slowxxx, -1. * cntl.sign * base.dip))
+        # solve elliptical layers in closed form, skipping the search below
+        if SNELLFORM and self.rrr4 == 0.:
+            self.angle = self._ellipse(cntl=cntl, slowxxx=slowxxx, base=base)
+            self.angle0 = \
+                cp(self.angle) if self.ggg == 0. \
+                else _inversion(angle=self.angle, cntl=cntl)
+            aux.sine = np.sin(self.angle + cntl.sign * base.dip)
+            aux.maxdsine = 0.
         while aux.maxdsine > MAXDSINE:
             # firstly, calculate phase velocity with possibly updated layer
             # parameter+stretch for normal incidence; later, recalculate phase
@@ -2717,7 +3613,7 @@ class Phase(Vel):
             # define sin(angle)
             aux.sine = np.sin(dipangle)
             # difference p*v - sin(angle):
-            aux.dsine = slow.xxx * self.mag - aux.sine
+            aux.dsine = slowxxx * self.mag - aux.sine
             # check with previous result
             # note, at the lower boundary (=-1) and further decreasing or
             # conversely does not give real incidence angle
@@ -2750,19 +3646,26 @@ class Phase(Vel):
                 break
             # get maximum remaining error in sine,
             # max(abs(delta(sine))) where -1 < sine < +1
-            try:
-                aux.maxdsine = \
-                    np.nanmax(np.abs(aux.dsine[np.abs(aux.sine) != 1.0]))
-            except RuntimeWarning:
-                # ignore if all sine = 1.0 or np.nan
-                # note, sine might bounce back from +/-1., otherwise maxiterat
-                pass
+            # note, keep if all sine = 1.0 or np.nan: sine might bounce back
+            # from +/-1., otherwise maxiterat
+            remain = np.abs(aux.dsine[np.abs(aux.sine) != 1.0])
+            remain = remain[np.logical_not(np.isnan(remain))]
+            if remain.size:
+                aux.maxdsine = np.max(remain)
             # emergency abortion
             aux.iteration()
+        # spread live rays over all rays
+        # note, velocities remain to be recalculated for all rays
+        sine = np.full(self.nos, np.nan)
+        sine[live] = aux.sine
+        for attr in ['angle', 'angle0']:
+            angle = np.full(self.nos, np.nan)
+            angle[live] = getattr(self, attr)
+            setattr(self, attr, angle)
         # check sanity
         _monotoneous()
         # flag
-        cntl.done[np.isnan(aux.sine)] = True
+        cntl.done[np.isnan(sine)] = True
         # return
         return cntl
 
@@ -2877,7 +3780,7 @@ class Energy(Vel):
 
         """
         # compute
-        with np.errstate(invalid='raise', divide='raise', over='raise'):
+        with numerics(invalid='raise', divide='raise', over='raise'):
             try:
                 # shorts
                 sine = np.sin(phase.angle)
@@ -2904,9 +3807,9 @@ class Energy(Vel):
                 raise AssertionError(
                     'bug in Energy.calc: overflow!') from unexpect3
         # check
-        assert \
-            np.all(np.isnan(self.angle) == cntl.done), \
-            "Energy.calc: additional nan computed!"
+        check(
+            test=lambda index: np.isnan(self.angle[index]) == cntl.done[index],
+            nos=self.nos, text="Energy.calc: additional nan computed!")
         # name
         self.name = cp(phase.name)
         # return
@@ -3056,7 +3959,9 @@ class Graph():
                 assert \
                     graphics['modus'] in ['inline', 'qt5'],\
                     "Graphics.__init__: unknown graphics mode"
-                get_ipython().run_line_magic('matplotlib', graphics['modus'])
+                ipython = importlib.import_module('IPython')
+                ipython.get_ipython().run_line_magic(
+                    'matplotlib', graphics['modus'])
             if graphics['control'] == 'matplotlib':
                 plt.switch_backend(graphics['modus'])
             # figure
@@ -3136,6 +4041,30 @@ class Graph():
         # return
         return self
 
+    def sample(self, sample=None):
+        """
+        Plot individual resampled wavefronts one at a time.
+
+        Parameters
+        ----------
+        sample : Sample
+            resampled wavefront
+
+        Returns
+        -------
+        self
+
+        """
+        # plot wavefronts
+        if FRONTPLOT:
+            self.axes.plot(
+                sample.xxx, sample.zzz,
+                color=sample.color, dashes=sample.dashes)
+            # show
+            plt.draw()
+        # return
+        return self
+
     def _stack(self, stack=None, source=None, cntl=None):
         """
         Plot the interfaces at/through which a wave is reflected/transmitted.
@@ -3216,10 +4145,11 @@ class Graph():
         # ###    np.ma.masked_where(np.logical_not(cntl.done), front.xxx),
         # ###    np.ma.masked_where(np.logical_not(cntl.done), front.zzz),
         # ###    color=front.color, dashes=front.dashes)
-        front.xxx[np.logical_not(cntl.done)] = np.nan
-        front.zzz[np.logical_not(cntl.done)] = np.nan
+        xxx, zzz, _ = front.latest()
+        xxx[np.logical_not(cntl.done)] = np.nan
+        zzz[np.logical_not(cntl.done)] = np.nan
         self.axes.plot(
-            front.xxx, front.zzz,
+            xxx, zzz,
             color=front.color, dashes=front.dashes)
         # show
         plt.draw()
@@ -3266,45 +4196,59 @@ class Graph():
 
         """
 
-        def _getsize():
+        def _getsize(width=None):
             """
-            Get the bounding box of an EPS file.
+            Get the tight bounding box of the figure for a given figure width.
+
+            The bounding box is the one plt.savefig writes with
+            bbox_inches='tight' and pad_inches=0, but it is measured in memory
+            by the renderer.
+
+            Parameters
+            ----------
+            width : float
+                input width of figure in inch
 
             Returns
             -------
             width : float
-                width of bounding box
+                width of bounding box in inch
             height : float
-                height of bounding box
+                height of bounding box in inch
 
             """
-            # define ghostscript command to extract bounding box
-            command = "gswin64c -dBATCH -dNOPAUSE -q -sDEVICE=bbox "
-            command += PUBLICEPS
-            # run above ghostscript command and store in result
-            result = subprocess.run(command, check=True, capture_output=True)
-            # extract bounding box, extract high-resolution bounding box
-            result = result.stderr.decode("utf-8")
-            result = result.split("\n")
-            print(f"\nreplace bounding box in {PUBLICEPS}")
-            print(result[1])
-            # extract width and height of image
-            result = result[1].split()
-            width = (float(result[3]) - float(result[1])) / 72
-            height = (float(result[4]) - float(result[2])) / 72
+            # set input width
+            self.fig.set_figwidth(width)
+            # lay out the figure without rendering any output
+            # note, constrained layout changes with figure width
+            with warnings.catch_warnings():   # suppression of warnings
+                warnings.simplefilter("ignore")
+                self.fig.draw_without_rendering()
+                bbox = \
+                    self.fig.get_tightbbox(self.fig.canvas.get_renderer())
             # return width and height
-            return width, height
+            return bbox.width, bbox.height
 
-        def _publicwin(step=0.1, errmax=1.e-3):
+        def _publicfit(step=0.1, errmax=1.e-3, maxiterat=20):
             """
             Adjust figure width to match required width of the bounding box.
 
+            Secant search for the input width whose tight bounding box is
+            PUBLICWIDTH wide; typically done in a few steps.
+
             Parameters
             ----------
             step : float
-                step size of input width; default arbitrary, but > 0
+                initial step size of input width; default arbitrary, but > 0
             errmax : float
                 max error of figure width; default > 0, but small
+            maxiterat : int
+                emergency break: maximum number of iterations
+
+            Raises
+            ------
+            AssertionError
+                emergency exit if no fit after maxiterat iterations
 
             Returns
             -------
@@ -3312,37 +4256,40 @@ class Graph():
 
             """
             # check switch
-            if PUBLICWIN:
-                # initialize
-                width = PUBLICWIDTH   # set above when initializing graphics
-                # extract old width of figure; discard height
-                oldout, _ = _getsize()
+            if PUBLICFIT:
+                # initialize with the first two input widths
+                oldwidth = PUBLICWIDTH   # set above when initializing graphics
+                olderror = PUBLICWIDTH - _getsize(width=oldwidth)[0]
+                width = oldwidth + step
+                error = PUBLICWIDTH - _getsize(width=width)[0]
                 # loop
-                error = sys.float_info.max
+                iterat = 0
                 while np.abs(error) > errmax:
-                    # try another input width
-                    # note, input width not identical with output width!
-                    width += step
-                    self.fig.set_figwidth(width)
-                    plt.savefig(
-                        PUBLICEPS, format='eps', bbox_inches='tight',
-                        pad_inches=0, transparent=True)
-                    # extract new width of figure
-                    newout, _ = _getsize()
                     # slope of output width over input width
-                    slope = (newout - oldout) / np.abs(step)
+                    slope = (olderror - error) / (width - oldwidth)
+                    assert \
+                        slope != 0., \
+                        "Graph.paper: figure width independent of input width"
+                    # preserve old input width and error
+                    oldwidth, olderror = width, error
+                    # calculate next input width
+                    # note, input width not identical with output width!
+                    width += error / slope
                     # current error
                     # note, desired PUBLICWIDTH - current output width
-                    error = PUBLICWIDTH - newout
-                    # preserve old current output width
-                    oldout = newout
-                    # calculate next input width
-                    step = error / slope
+                    error = PUBLICWIDTH - _getsize(width=width)[0]
+                    # emergency abortion
+                    iterat += 1
+                    assert \
+                        iterat <= maxiterat, \
+                        f"Graph.paper: no fit of figure width after {iterat}"
+                # report
+                output = "\nfit bounding box in {:s}"
+                output += "\nwidth={:f} at figure width={:f} after {:d} steps"
+                string = [PUBLICEPS, PUBLICWIDTH - error, width, iterat]
+                print(output.format(*string))
                 # final output
                 self.fig.set_figwidth(width)
-                plt.savefig(
-                    PUBLICEPS, format='eps', bbox_inches='tight',
-                    pad_inches=0, transparent=True)
 
         def _publiceps():
             """
@@ -3355,16 +4302,14 @@ class Graph():
             """
             # check switch
             if PUBLICEPS:
+                # fit bounding box to the desired width
+                _publicfit()
                 # save figure in EPS format
                 with warnings.catch_warnings():   # suppression of warnings
                     warnings.simplefilter("ignore")
                     plt.savefig(
                         PUBLICEPS, format='eps', bbox_inches='tight',
                         pad_inches=0, transparent=True)
-                # correct bounding box
-                # note, switch according to system platform; here, Windows only
-                platform = {'Windows': _publicwin()}
-                _ = platform[pf.system()]
 
         def _publicpng():
             """
@@ -3760,21 +4705,431 @@ class SearchAux():
         # return
         return self
 
+# ### accuracy ### accuracy ### accuracy ### accuracy ### accuracy ###
+
+
+class Accuracy(dict):
+    """
+    Check the phase velocity solver layer by layer over a fine angle grid.
+
+    The maximum errors are kept in a dict keyed by state and layer name.
+
+    """
+
+    def __init__(self, stacks=None, nos=None):
+        """
+        Sweep all layers of all stacks.
+
+        Parameters
+        ----------
+        stacks : Stacks
+            original and stretched stack of layers
+        nos : int
+            number of phase angles over the open interval (-90, +90) degree
+
+        Returns
+        -------
+        none
+
+        """
+        # inherit
+        super().__init__()
+        # phase angles, excluding horizontal ones
+        angle = np.linspace(-0.5 * np.pi, +0.5 * np.pi, nos + 2)[1:-1]
+        # check each layer in each state
+        for demo in DEMO:
+            for layer in stacks[demo]:
+                self[demo, layer.name] = self._layer(layer=layer, angle=angle)
+
+    @staticmethod
+    def _layer(layer=None, angle=None):
+        """
+        Check a layer.
+
+        Parameters
+        ----------
+        layer : Layer
+            layer checked
+        angle : np.array of float
+            original phase angles
+
+        Returns
+        -------
+        error : tuple of float
+            maximum error in differential phase velocity relative to vvv0,
+            maximum error in Snell's angle and energy angle in degree, and
+            run time in seconds
+
+        """
+        # start the clock
+        start = time.perf_counter()
+        # set up control for downward propagation
+        nos = len(angle)
+        cntl = Control().direction(direct='down').doing(nos=nos)
+        # calculate phase and differential phase velocity
+        para = Para(layer=layer)
+        phase = \
+            Phase(nos=nos).\
+            initpara(para=para).\
+            initangle(ang=angle).\
+            calc(cntl=cntl).\
+            diffcalc(cntl=cntl)
+        # calculate energy velocity
+        energy = Energy(nos=nos).calc(cntl=cntl, phase=phase)
+        # compare differential phase velocity with numerical differential
+        # note, skip one-sided differentials at the ends
+        grad = np.gradient(phase.mag, phase.angle)
+        ddiff = np.abs(phase.diffmag - grad)[1:-1] / phase.vvv0
+        # calculate the numerical tangent to the slowness curve
+        dsxxx = np.gradient(np.sin(phase.angle) / phase.mag, phase.angle)
+        dszzz = np.gradient(np.cos(phase.angle) / phase.mag, phase.angle)
+        # energy velocity is normal to slowness curve, pointing outwards
+        dangle = np.arctan2(-dszzz, dsxxx) - energy.angle
+        dangle = np.abs(np.mod(dangle + np.pi, 2. * np.pi) - np.pi)[1:-1]
+        # calculate slowness along the base of the layer
+        base = Face(layer=layer)
+        slow = Slow(nos=nos).calc(cntl=cntl, top=base, phase=phase)
+        # exclude grazing incidence
+        graze = 0.5 * np.pi - np.deg2rad(ACCURACYGRAZE)
+        slow.xxx[np.logical_not(np.abs(slow.angle) < graze)] = np.nan
+        # search Snell's angle for the same slowness in the same layer
+        cntl.doing(nos=nos)
+        snell = Phase(nos=nos).initpara(para=para)
+        cntl = snell.search(cntl=cntl, slow=slow, base=base)
+        dsnell = np.abs(snell.angle - phase.angle)[~cntl.done]
+        # collect maximum errors
+        error = (
+            np.max(ddiff),
+            np.rad2deg(np.max(dsnell, initial=0.)),
+            np.rad2deg(np.max(dangle)),
+            time.perf_counter() - start)
+        # return
+        return error
+
+    def info(self):
+        """
+        Print maximum errors per layer.
+
+        Returns
+        -------
+        self : Accuracy
+            report, but unchanged
+
+        """
+        # write title
+        print('\naccuracy of the phase velocity solver:')
+        # write header
+        width = max(len(name) for _, name in self)
+        header = 'state' + ' ' * 6 + 'layer' + ' ' * (width - 2)
+        header += 'diff phase vel   Snell angle   energy angle   seconds'
+        print(header)
+        # define format
+        output = f"{{:9s}}  {{:{width}s}}"
+        output += "   {:14.3e}   {:11.3e}   {:12.3e}   {:7.3f}"
+        # print each layer
+        for (demo, name), error in self.items():
+            print(output.format(demo, name, *error))
+        # return
+        return self
+
+
+# ### cache ### cache ### cache ### cache ### cache ### cache ### cache ###
+
+
+class Cache(dict):
+    """
+    Cache the state of the rays after each leg of a travelpath.
+
+    The state after a leg depends only on the source, the traveltime and the
+    parameters of all layers and interfaces traversed up to and including that
+    leg; so, it is keyed by exactly those. Once a leg is affected by a change,
+    the keys of all legs thereafter change, too, and propagation resumes from
+    that leg. Original and stretched state share a leg if identical.
+
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty cache.
+
+        Instance
+        --------
+        self.lock : threading.Lock
+            guards looking up, restoring and storing legs, see WORKERS
+        self.used : set of tuple
+            keys of the legs stored or restored in the latest run
+
+        Returns
+        -------
+        none
+
+        """
+        # inherit
+        super().__init__()
+        # lock
+        self.lock = threading.Lock()
+        # legs stored or restored in the latest run
+        self.used = set()
+
+    def key(self, cntl=None, source=None, path=None):
+        """
+        Compose the keys of all legs along a travelpath.
+
+        Parameters
+        ----------
+        cntl : Control
+            parameters controlling the simulation
+        source : Source
+            source
+        path : Path
+            travelpath
+
+        Returns
+        -------
+        keys : list of tuple
+            key of each leg, including all legs before
+
+        """
+        # common to all legs: source, traveltime and hard-wired parameters
+        key = (
+            source.nos, source.angle[0], source.angle[-1],
+            source.xxx, source.zzz, source.time,
+            cntl.time,
+            tuple(GRAPHICS[item] for item in ('xmin', 'xmax', 'zmin', 'zmax')),
+            FACETOL, MAXDSINE, SCLFAC, MAXITERAT, SNELLFORM)
+        # add one leg at a time
+        keys = []
+        for ipat, para, base, top in path.next(surface=SURFACE):
+            key += (
+                path.direct[ipat],
+                tuple(getattr(para, item) for item in PARAMETERLIST),
+                tuple(getattr(base, item) for item in FACELIST),
+                tuple(getattr(top, item) for item in FACELIST))
+            keys.append(key)
+        # return
+        return keys
+
+    def store(self, key=None, cntl=None, front=None, slow=None):
+        """
+        Store the state of the rays after a leg.
+
+        Parameters
+        ----------
+        key : tuple
+            key of the leg
+        cntl : Control
+            parameters controlling the simulation
+        front : Front
+            wavefront after the leg
+        slow : Slow
+            slowness parallel to the interface at the end of the leg
+
+        Returns
+        -------
+        self : Cache
+            with the state added, and the oldest one removed if full
+
+        """
+        # copy arrays updated in place later on
+        # note, slow is not updated, but replaced by a new Slow
+        self[key] = (
+            front.xxx.copy(), front.zzz.copy(), front.time.copy(),
+            front.done.copy(), front.before.copy(), cntl.done.copy(), slow)
+        self.used.add(key)
+        # forget the oldest leg, if limited
+        while CACHESIZE and len(self) > CACHESIZE:
+            del self[next(iter(self))]
+        # return
+        return self
+
+    def restore(self, key=None, cntl=None, front=None):
+        """
+        Restore the state of the rays after a leg.
+
+        Parameters
+        ----------
+        key : tuple
+            key of the leg
+        cntl : Control
+            parameters controlling the simulation
+        front : Front
+            wavefront to be overwritten
+
+        Returns
+        -------
+        front : Front
+            wavefront after the leg
+        cntl : Control
+            done after the leg
+        slow : Slow
+            slowness after the leg
+
+        """
+        # mark as recently used
+        state = self.pop(key)
+        self[key] = state
+        self.used.add(key)
+        # copy arrays to be updated in place later on
+        xxx, zzz, time, done, before, cntldone, slow = state
+        front.xxx = xxx.copy()
+        front.zzz = zzz.copy()
+        front.time = time.copy()
+        front.done = done.copy()
+        front.before = before.copy()
+        cntl.done = cntldone.copy()
+        # return
+        return front, cntl, slow
+
+    def forget(self):
+        """
+        Forget the legs not stored or restored in the latest run.
+
+        Returns
+        -------
+        self : Cache
+            with the legs of the latest run only
+
+        """
+        # remove legs unused
+        for key in [key for key in self if key not in self.used]:
+            del self[key]
+        # start afresh with the next run
+        self.used.clear()
+        # return
+        return self
+
+
+CACHE = Cache()   # kept between calls of main
+
+
 # ### main ### main ### main ### main ### main ### main ### main ### main ###
 
 
+def propagate(cntl=None, source=None, path=None, front=None):
+    """
+    Propagate a wavefront along a travelpath in one state.
+
+    Note, shares nothing with other states but the source; so, the states may
+    be propagated concurrently, see WORKERS.
+
+    Parameters
+    ----------
+    cntl : Control
+        parameters controlling the simulation, set to the state
+    source : Source
+        source
+    path : Path
+        travelpath in the state
+    front : Front
+        wavefront in the state
+
+    Returns
+    -------
+    front : Front
+        wavefront at the end of the travelpath
+    done : np.array of bool
+        rays or wavefront points completed
+    legs : list of tuple
+        control and wavefront after each leg if plotted, empty otherwise
+
+    """
+
+    # pylint: disable=too-many-locals
+
+    # keep control and wavefront after each leg, if plotted
+    legs = []
+    keep = FRONTPLOT and not FRONTSPACING
+    # compose the keys of the legs along the travelpath
+    keys = \
+        CACHE.key(cntl=cntl, source=source, path=path) \
+        if INCREMENTAL else None
+    # loop through each segment of path
+    slow = None   # dummy value to please linting
+    for cntl.ipat, para, base, top in path.next(surface=cp(SURFACE)):
+        # reuse leg if cached
+        with CACHE.lock:
+            cached = INCREMENTAL and keys[cntl.ipat] in CACHE
+            if cached:
+                front, cntl, slow = \
+                    CACHE.restore(
+                        key=keys[cntl.ipat], cntl=cntl, front=front)
+        if cached:
+            if keep:
+                legs.append((cp(cntl), cp(front)))
+            continue
+        # report current segment
+        cntl.\
+            direction(direct=path.direct[cntl.ipat]).\
+            report(base=base, top=top)
+        # set up phase velocity with layer parameters
+        phase = \
+            Phase(nos=source.nos).\
+            initpara(para=cp(para))
+        # check status of wavefront
+        if not np.all(cntl.done):
+            # for first=top layer only
+            if cntl.ipat == 0:
+                # set up phase velocity with source emission angles
+                phase.initangle(ang=source.angle)
+            # for second and lower layers
+            else:
+                cntl = \
+                    phase.search(
+                        cntl=cntl, slow=cp(slow), base=base)
+                # note, slow is defined for all index > 0, that is
+                # after having hit first interface
+            # do/redo and report phase velocity
+            phase.calc(cntl=cntl).info()
+            # calculate differential phase velocity and check
+            phase.diffcalc(cntl=cntl).diffinfo().diffcheck()
+            # calculate energy velocity
+            energy = \
+                Energy(nos=source.nos).\
+                calc(cntl=cntl, phase=cp(phase)).\
+                info()
+            # propagate wavefront
+            front, cntl = \
+                front.crosspoint(
+                    cntl=cntl, top=top, energy=cp(energy))
+            # calculate parallel slowness
+            slow = \
+                Slow(nos=source.nos).\
+                calc(cntl=cntl, top=top, phase=cp(phase)).\
+                info()
+        # cache leg
+        if INCREMENTAL:
+            with CACHE.lock:
+                CACHE.store(
+                    key=keys[cntl.ipat], cntl=cntl, front=front,
+                    slow=slow)
+        # keep for graphics
+        if keep:
+            legs.append((cp(cntl), cp(front)))
+
+    # return
+    return front, cntl.done, legs
+
+
 def main():
     """
     Demonstrate the concept of depth - velocity - anisotropy ambiguity.
 
     Returns
     -------
-    none
+    summary : list of dict
+        per traveltime, the time, and the misfit of the stretched versus the
+        original wavefront as by Samples.misfit and of the surface arrivals
+        as by Arrivals.misfit; either None unless FRONTSPACING or
+        ARRIVALSPACING, respectively
 
     """
 
     # pylint: disable=too-many-locals
 
+    # derive and check settings
+    configure()
+    # misfit per traveltime
+    summary = []
     # set up control, that is all parameters controlling the simulation:
     # the source is assumed to be located at the surface; so, initial
     # propagation is downwards
@@ -3786,6 +5141,10 @@ def main():
     graph.source(source=source)
     # set up the layer stack
     stacks = Stacks(stack=cp(STACK), graph=graph).info()
+    # check the solver layer by layer instead of propagating
+    if ACCURACY:
+        Accuracy(stacks=stacks, nos=ACCURACYNOS).info()
+        return summary
     # set up graphics and plot interfaces and sources
     graph.stacks(stacks=stacks, source=source, cntl=cntl)
     # set up travelpaths
@@ -3794,64 +5153,51 @@ def main():
     for cntl.itim, cntl.time in enumerate(TRAVELTIMES):
         # set up a list of wavefronts
         fronts = Fronts(cntl=cntl, source=cp(source))
-        # loop through variations (original, stretch and possibly others)
-        for demo in DEMO:
-            cntl.\
-                demonstration(demo=cp(demo)).\
-                doing(nos=source.nos)
-            # short for paths[demo]
-            path = paths[cntl.demo]
-            # short for wavefront[demo]
-            front = fronts[cntl.demo]
-            # loop through each segment of path
-            slow = None   # dummy value to please linting
-            for cntl.ipat, para, base, top in path.next(surface=cp(SURFACE)):
-                # report current segment
-                cntl.\
-                    direction(direct=path.direct[cntl.ipat]).\
-                    report(base=base, top=top)
-                # set up phase velocity with layer parameters
-                phase = \
-                    Phase(nos=source.nos).\
-                    initpara(para=cp(para))
-                # check status of wavefront
-                if not np.all(cntl.done):
-                    # for first=top layer only
-                    if cntl.ipat == 0:
-                        # set up phase velocity with source emission angles
-                        phase.initangle(ang=source.angle)
-                    # for second and lower layers
-                    else:
-                        cntl = \
-                            phase.search(
-                                cntl=cntl, slow=cp(slow), base=base)
-                        # note, slow is defined for all index > 0, that is
-                        # after having hit first interface
-                    # do/redo and report phase velocity
-                    phase.calc(cntl=cntl).info()
-                    # calculate differential phase velocity and check
-                    phase.diffcalc(cntl=cntl).diffinfo().diffcheck()
-                    # calculate energy velocity
-                    energy = \
-                        Energy(nos=source.nos).\
-                        calc(cntl=cntl, phase=cp(phase)).\
-                        info()
-                    # propagate wavefront
-                    front, cntl = \
-                        front.crosspoint(
-                            cntl=cntl, top=top, energy=cp(energy))
-                    # calculate parallel slowness
-                    slow = \
-                        Slow(nos=source.nos).\
-                        calc(cntl=cntl, top=top, phase=cp(phase)).\
-                        info()
-                # prepare graphics
-                graph.front(cntl=cntl, front=cp(front))
+        # propagate all variations (original, stretch and possibly others),
+        # concurrently if WORKERS > 1
+        with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+            run = pool.map if WORKERS > 1 else map
+            states = run(
+                lambda demo: propagate(
+                    cntl=cp(cntl).demonstration(demo=demo).doing(
+                        nos=source.nos),
+                    source=source, path=paths[demo], front=fronts[demo]),
+                DEMO)
+            # merge wavefronts and plot them leg by leg
+            for demo, (front, cntl.done, legs) in zip(DEMO, states):
+                fronts[demo] = front
+                for leg in legs:
+                    graph.front(cntl=leg[0], front=leg[1])
         # print wavefront
         fronts.info(cntl=cntl)
+        # export wavefront
+        if FRONTEXPORT:
+            fronts.save(file=f"{FRONTEXPORT}{cntl.itim:03d}.front", cntl=cntl)
+        # resample wavefronts, plot and compare
+        if FRONTSPACING:
+            samples = \
+                Samples(fronts=fronts, spacing=FRONTSPACING).\
+                info(cntl=cntl)
+            for demo in DEMO:
+                graph.sample(sample=samples[demo])
+        # compare surface arrivals
+        if ARRIVALSPACING:
+            arrivals = \
+                Arrivals(fronts=fronts, spacing=ARRIVALSPACING).\
+                info(cntl=cntl)
+        # summarize misfits
+        summary.append({
+            'time': cntl.time,
+            'front': samples.misfit() if FRONTSPACING else None,
+            'surface': arrivals.misfit() if ARRIVALSPACING else None})
+    # keep the legs of this run only
+    if INCREMENTAL:
+        CACHE.forget()
     # print out
     graph.show(graphics=GRAPHICS)
     graph.paper()
+    # return
+    return summary
 
 
 def entry():
@@ -3896,5 +5242,6 @@ if __name__ == "__main__":
         # set warnings and call main function
         entry()
     else:
-        # alternatively, call main function directly
-        main()
+        # alternatively, call main function directly, ignoring numerics
+        with np.errstate(all='ignore'):
+            main()
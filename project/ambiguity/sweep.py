@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+"""
+
+Sweeping the layer parameters of ambiguity.py over a grid in a pool of
+processes, with checkpoints to resume an interrupted sweep
+
+Each grid point runs ambiguity.main without graphics and keeps the misfit of
+the stretched versus the original wavefront and surface traveltimes at each
+traveltime. Finished points are appended to CHECKPOINT as they come in;
+rerunning the sweep skips them. Finally, a summary table of all grid points is
+printed.
+
+"""
+
+
+# libraries to be imported
+import io
+import json
+import itertools
+import contextlib
+from multiprocessing import Pool
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')   # no display
+import ambiguity as amb   # pylint: disable=wrong-import-position
+
+
+# ### change the "user-defined parameters" below as you see fit ###
+
+
+# parameter grid
+# SWEEP = {<layer>: {<parameter>: [<value>, ...], ...}, ...}, where
+# <layer> is the name of a layer dict in ambiguity.py, e.g. 'OVERBURDEN', and
+# <parameter> any of its numeric keys, e.g. 'rrr2', 'rrr4', 'dip' or 'ggg';
+# units as in ambiguity.py, that is angles in degree
+# note, the tilt of the symmetry axis is not a key, but follows the dip of the
+# layer above; so, sweep that dip instead
+SWEEP = {
+    'OVERBURDEN': {'ggg': [0.3, 0.5, 0.7]},
+    'TARGET': {'rrr4': [-0.2, 0.], 'dip': [-15., -5.]}}
+
+
+# simulation
+NOS = 18001     # number of rays per grid point
+SPACING = 10.   # arc length between wavefront samples for the misfit
+OFFSET = 10.    # offset between surface traveltimes for the misfit
+
+
+# execution
+WORKERS = 4                  # number of processes
+CHECKPOINT = 'sweep.jsonl'   # finished grid points, one JSON line each
+
+
+# ### sweep ### sweep ### sweep ### sweep ### sweep ### sweep ### sweep ###
+
+
+def grid(sweep=None):
+    """
+    Expand a parameter grid into its points.
+
+    Parameters
+    ----------
+    sweep : dict
+        see SWEEP
+
+    Returns
+    -------
+    points : list of list
+        per point, a list of [layer, parameter, value]
+
+    """
+    # flatten layer and parameter names
+    names = [
+        (layer, param) for layer, params in sweep.items() for param in params]
+    values = [sweep[layer][param] for layer, param in names]
+    # return all combinations
+    return [
+        [[layer, param, value] for (layer, param), value in zip(names, combi)]
+        for combi in itertools.product(*values)]
+
+
+def setup():
+    """
+    Switch off graphics, printouts and debug mode in a worker process.
+
+    Returns
+    -------
+    none
+
+    """
+    # graphics
+    amb.GRAPHICS['modus'] = 'Agg'
+    amb.FACEPLOT = amb.SOURCEPLOT = amb.FRONTPLOT = amb.RAYPLOT = False
+    # printouts
+    amb.STACKPRINT = amb.CROSSPRINT = amb.MISFITPRINT = False
+    # production mode
+    amb.DEBUG = False
+    # resolution
+    amb.SOURCE['nos'] = NOS
+    amb.FRONTSPACING = SPACING
+    amb.ARRIVALSPACING = OFFSET
+
+
+def simulate(point=None):
+    """
+    Run ambiguity.main for one grid point.
+
+    Note, the layer dicts are modified in place; each point sets all swept
+    parameters, so nothing carries over between the points of a worker.
+
+    Parameters
+    ----------
+    point : list
+        see grid
+
+    Raises
+    ------
+    AssertionError
+        if a layer or parameter is unknown, as it would be ignored otherwise
+
+    Returns
+    -------
+    point : list
+        as given
+    summary : list of dict
+        misfits per traveltime, see ambiguity.main; None for nan, e.g. the
+        surface misfit of a traveltime without any surface arrivals
+
+    """
+    # update layers
+    # note, settings depending on layers are derived by ambiguity.main
+    for layer, param, value in point:
+        check = \
+            isinstance(getattr(amb, layer, None), dict) and \
+            param in getattr(amb, layer) and param not in ('name', 'key')
+        text = f"simulate: {layer}['{param}'] cannot be swept!"
+        assert check, text
+        getattr(amb, layer)[param] = value
+    # simulate, silencing the progress reports
+    with np.errstate(all='ignore'), \
+            contextlib.redirect_stdout(io.StringIO()):
+        summary = amb.main()
+    # release figure
+    amb.plt.close('all')
+    # replace nan by None, as nan is no valid JSON
+    summary = [
+        {
+            key: (
+                {
+                    name: (
+                        None
+                        if isinstance(number, float) and np.isnan(number)
+                        else number)
+                    for name, number in misfit.items()}
+                if isinstance(misfit, dict) else misfit)
+            for key, misfit in item.items()}
+        for item in summary]
+    # return
+    return point, summary
+
+
+def restore(checkpoint=None):
+    """
+    Read the finished grid points.
+
+    Note, a last line cut off by an interruption is ignored.
+
+    Parameters
+    ----------
+    checkpoint : str
+        see CHECKPOINT
+
+    Returns
+    -------
+    finished : dict
+        summary keyed by the JSON string of its point
+
+    """
+    # collect
+    finished = {}
+    try:
+        with open(checkpoint, 'r', encoding='utf-8') as infile:
+            for line in infile:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                finished[json.dumps(record['point'])] = record['summary']
+    except FileNotFoundError:
+        pass
+    # return
+    return finished
+
+
+def repair(checkpoint=None):
+    """
+    Cut off a last line left incomplete by an interruption.
+
+    Note, otherwise, the next record would be appended to that line, and both
+    were lost to restore.
+
+    Parameters
+    ----------
+    checkpoint : str
+        see CHECKPOINT
+
+    Returns
+    -------
+    none
+
+    """
+    # truncate behind the last line break, if any
+    try:
+        with open(checkpoint, 'rb+') as infile:
+            content = infile.read()
+            infile.truncate(content.rfind(b'\n') + 1)
+    except FileNotFoundError:
+        pass
+
+
+def worst(summary=None, kind=None):
+    """
+    Find the worst misfit over all traveltimes.
+
+    Parameters
+    ----------
+    summary : list of dict
+        misfits per traveltime, see ambiguity.main
+    kind : str
+        'front' or 'surface'
+
+    Returns
+    -------
+    rms, max : float or nan
+        largest rms and maximum misfit; nan if none
+
+    """
+    # collect misfits computed
+    misfits = [
+        item[kind] for item in summary
+        if item[kind] is not None and item[kind]['nos']]
+    # return
+    return (
+        max((misfit['rms'] for misfit in misfits), default=np.nan),
+        max((misfit['max'] for misfit in misfits), default=np.nan))
+
+
+def info(points=None, finished=None):
+    """
+    Print the worst misfits over all traveltimes for each grid point.
+
+    Parameters
+    ----------
+    points : list
+        see grid
+    finished : dict
+        see restore
+
+    Returns
+    -------
+    none
+
+    """
+    # write title
+    print('\nsweep summary (worst misfit over all traveltimes):')
+    # write header
+    names = [f"{layer.lower()}.{param}" for layer, param, _ in points[0]]
+    names += ['front rms', 'front max', 'time rms', 'time max']
+    width = max(len(name) for name in names)
+    print(''.join(f"{name:>{width}s} " for name in names))
+    # define format
+    output = f"{{:{width}.3f}} " * (len(names) - 2)
+    output += f"{{:{width}.3e}} " * 2
+    # print each point finished
+    for point in points:
+        summary = finished.get(json.dumps(point))
+        if summary is None:
+            continue
+        string = [value for _, _, value in point]
+        string += worst(summary=summary, kind='front')
+        string += worst(summary=summary, kind='surface')
+        print(output.format(*string))
+
+
+def main():
+    """
+    Sweep the grid, skipping points already finished.
+
+    Returns
+    -------
+    finished : dict
+        see restore
+
+    """
+    # set up grid and read checkpoint
+    points = grid(sweep=SWEEP)
+    finished = restore(checkpoint=CHECKPOINT)
+    todo = [point for point in points if json.dumps(point) not in finished]
+    # simulate the remaining points and checkpoint them one by one
+    repair(checkpoint=CHECKPOINT)
+    with open(CHECKPOINT, 'a', encoding='utf-8') as outfile:
+        with Pool(processes=WORKERS, initializer=setup) as pool:
+            for point, summary in pool.imap_unordered(simulate, todo):
+                finished[json.dumps(point)] = summary
+                record = {'point': point, 'summary': summary}
+                outfile.write(json.dumps(record, allow_nan=False) + '\n')
+                outfile.flush()
+    # print summary
+    info(points=points, finished=finished)
+    # return
+    return finished
+
+
+###############################################################################
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+
+Testing the checkpoints of sweep.py, resuming an interrupted sweep
+
+"""
+
+
+# libraries to be imported
+import json
+import sweep
+
+
+# parameter grid of 4 points
+SWEEP = {'ROCK': {'dip': [-5., -4.]}, 'TARGET': {'rrr4': [-0.2, 0.]}}
+
+
+class Serial():
+    """
+    Stand in for a pool of processes, simulating one point after the other.
+
+    """
+
+    def __init__(self, processes=None, initializer=None):
+        # pylint:disable=unused-argument   # as multiprocessing.Pool
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    @staticmethod
+    def imap_unordered(func, iterable):
+        """
+        Simulate all points in order.
+
+        """
+        # return
+        return map(func, iterable)
+
+
+def simulate(point=None):
+    """
+    Stand in for sweep.simulate, with an empty surface misfit.
+
+    """
+    # return
+    return point, [{
+        'time': 3.,
+        'front': {'rms': 1., 'max': 2., 'nos': 10},
+        'surface': {'rms': None, 'max': None, 'nos': 0}}]
+
+
+def test_resume(tmp_path, monkeypatch):
+    """
+    A checkpoint cut off mid-line resumes without losing a point.
+
+    """
+    # sweep without processes
+    checkpoint = str(tmp_path / 'sweep.jsonl')
+    monkeypatch.setattr(sweep, 'SWEEP', SWEEP)
+    monkeypatch.setattr(sweep, 'CHECKPOINT', checkpoint)
+    monkeypatch.setattr(sweep, 'Pool', Serial)
+    monkeypatch.setattr(sweep, 'simulate', simulate)
+    # sweep all, then cut the checkpoint mid-way through the last line
+    sweep.main()
+    with open(checkpoint, 'r', encoding='utf-8') as infile:
+        lines = infile.readlines()
+    assert len(lines) == 4
+    with open(checkpoint, 'w', encoding='utf-8') as outfile:
+        outfile.write(''.join(lines[:-1]) + lines[-1][:len(lines[-1]) // 2])
+    assert len(sweep.restore(checkpoint=checkpoint)) == 3
+    # resume
+    finished = sweep.main()
+    assert len(finished) == 4
+    # all lines complete and valid JSON, no point twice
+    with open(checkpoint, 'r', encoding='utf-8') as infile:
+        records = [json.loads(line) for line in infile]
+    assert len(records) == 4
+    assert len(sweep.restore(checkpoint=checkpoint)) == 4
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+
+Testing the batched ttwean pipeline of ttwean_for_ttcrpy/ttbatch.py, against
+the full ttwean package via ttbench.check if installed and usable
+
+"""
+
+
+# libraries to be imported
+import pytest
+import numpy as np
+from ttwean_for_ttcrpy.ttwean import TTWean
+from ttwean_for_ttcrpy.ttbatch import TTBatch
+import ttbench
+
+
+# media, one per row
+VP0 = np.array([[1875.], [2500.], [3000.]])
+VS0 = np.array([[826.], [1200.], [1500.]])
+RHO = np.array([[2.], [2.2], [2.4]])
+DELTA = np.array([[0.1], [-0.05], [0.2]])
+EPSILON = np.array([[0.225], [0.1], [0.3]])
+GGG = np.array([[0.2], [0.], [0.5]])
+
+
+# incidence phase angles in radiant
+RAD = np.deg2rad(np.linspace(0., 60., 61))
+
+
+def usable():
+    """
+    Check whether the full ttwean package is usable, see ttbench.package.
+
+    Returns
+    -------
+    usable : bool
+        T / F for usable / not usable
+
+    """
+    # return
+    return ttbench.package() is not None
+
+
+@pytest.mark.skipif(not usable(), reason="ttwean package not usable")
+def test_check(monkeypatch):
+    """
+    The batched grid agrees with the ttwean package point by point.
+
+    """
+    # check all grid points
+    records = [
+        record for wavetype in ttbench.WAVETYPES
+        for record in ttbench.batch(wavetype=wavetype)]
+    monkeypatch.setattr(ttbench, 'CHECK', len(records))
+    # compare
+    assert ttbench.check(records=records) < 1e-10
+
+
+@pytest.mark.parametrize("wavetype", ["P", "SV"])
+def test_ttexact(wavetype):
+    """
+    One call over all media equals one call per medium.
+
+    """
+    # all media at once
+    rad, mag = (
+        TTBatch.ttexact(
+            vp0=VP0, vs0=VS0, rho=RHO, delta=DELTA, epsilon=EPSILON,
+            wavetype=wavetype, ggg=GGG, rad=RAD))
+    # each medium
+    for iii in range(len(VP0)):
+        one = (
+            TTBatch.ttexact(
+                vp0=float(VP0[iii, 0]), vs0=float(VS0[iii, 0]),
+                rho=float(RHO[iii, 0]), delta=float(DELTA[iii, 0]),
+                epsilon=float(EPSILON[iii, 0]), wavetype=wavetype,
+                ggg=float(GGG[iii, 0]), rad=RAD))
+        np.testing.assert_allclose(rad[iii], one[0], rtol=1e-14)
+        np.testing.assert_allclose(mag[iii], one[1], rtol=1e-14)
+
+
+@pytest.mark.parametrize("wavetype", ["P", "SV"])
+def test_ttpara2(wavetype):
+    """
+    The linear energy-velocity parameters equal those of TTWean.ttinit.
+
+    """
+    # batched
+    para2 = (
+        TTBatch.ttpara2(
+            para1=TTBatch.ttpara1(
+                vp0=VP0, vs0=VS0, delta=DELTA, epsilon=EPSILON,
+                wavetype=wavetype, ggg=GGG)))
+    # ttinit
+    vp0, vs0, sss = (
+        TTWean.ttinit(
+            vp0=VP0, vs0=VS0, delta=DELTA, epsilon=EPSILON,
+            wavetype=wavetype, ggg=GGG))
+    # compare
+    np.testing.assert_allclose(para2['vp0'], vp0, rtol=1e-14)
+    np.testing.assert_allclose(para2['vs0'], vs0, rtol=1e-14)
+    np.testing.assert_allclose(para2['s2'], sss['s2'], rtol=1e-12)
+    np.testing.assert_allclose(para2['s4'], sss['s4'], rtol=1e-12)
+
+
+@pytest.mark.skipif(not usable(), reason="ttwean package not usable")
+@pytest.mark.parametrize("wavetype", ["P", "SV"])
+def test_para(wavetype):
+    """
+    The phase- and energy-velocity parameters equal those of the package.
+
+    """
+    # pylint:disable=invalid-name   # as abbreviated by the ttwean package
+    # batched
+    para1 = (
+        TTBatch.ttpara1(
+            vp0=VP0, vs0=VS0, delta=DELTA, epsilon=EPSILON,
+            wavetype=wavetype))
+    para2 = TTBatch.ttpara2(para1=para1)
+    # each medium with the package
+    tw = ttbench.package()
+    for iii in range(len(VP0)):
+        thomsen = (
+            tw.Thomsen().input_to_thomsen(
+                vp0=float(VP0[iii, 0]), vs0=float(VS0[iii, 0]),
+                delta=float(DELTA[iii, 0]), epsilon=float(EPSILON[iii, 0]),
+                rho=float(RHO[iii, 0])))
+        para = tw.Para1()
+        para = (
+            para.thomsen_to_p_para1(thomsen=thomsen, flag={'print': False})
+            if wavetype == "P" else
+            para.thomsen_to_sv_para1(thomsen=thomsen, flag={'print': False}))
+        energy = tw.Para2().para1_to_para2(para1=para, flag={'print': False})
+        # compare
+        for name, row in (('r2', 2), ('r4', 4)):
+            assert np.isclose(para1[name][iii, 0], para.rrr[row, 0])
+        for name, row in (('o2', 2), ('o4', 4)):
+            assert np.isclose(para1[name][iii, 0], para.ooo[row, 0])
+        for name, row in (('t2', 2), ('t4', 4)):
+            assert np.isclose(para2[name][iii, 0], energy.ttt[row, 0])
+        for name, row in (('s2', 2), ('s4', 4)):
+            assert np.isclose(para2[name][iii, 0], energy.sss[row, 0])
+
+
+def test_ttstretch():
+    """
+    A neutral stretch keeps phase angles in all quadrants.
+
+    """
+    # all quadrants
+    _, rad = TTBatch.ttangles(start=-180., end=180., nos=361)
+    mag = np.full_like(rad, fill_value=1875.)
+    dmag = np.zeros_like(rad)
+    # neutral stretch
+    stretched, smag, sdmag = (
+        TTBatch.ttstretch(rad=rad, mag=mag, dmag=dmag, ggg=0.))
+    # compare
+    np.testing.assert_allclose(stretched, rad, atol=1e-12)
+    np.testing.assert_allclose(smag, mag, rtol=1e-14)
+    np.testing.assert_allclose(sdmag, dmag, atol=1e-12)
+
+
+@pytest.mark.skipif(not usable(), reason="ttwean package not usable")
+def test_package_stretch():
+    """
+    Angles and stretch equal those of the package in all quadrants.
+
+    """
+    # pylint:disable=invalid-name   # as abbreviated by the ttwean package
+    # batched
+    grad, rad = TTBatch.ttangles(start=-180., end=180., nos=361)
+    mag = np.full_like(rad, fill_value=1875.)
+    dmag = np.zeros_like(rad)
+    stretched = TTBatch.ttstretch(rad=rad, mag=mag, dmag=dmag, ggg=0.5)
+    # package
+    tw = ttbench.package()
+    angle = tw.Angle().input_to_angles(start=-180., end=180., nos=361)
+    velocity = tw.VoigtPhaseVelocity()   # an ExactPhaseVelocity
+    velocity.rad = rad.copy()
+    velocity.mag.abs = mag.copy()
+    velocity.dmag.abs = dmag.copy()
+    velocity.vp0, velocity.vs0 = 1875., 826.
+    velocity = velocity.exact_stretch(ggg=0.5)
+    # compare
+    np.testing.assert_allclose(grad, angle.grad, rtol=1e-14)
+    np.testing.assert_allclose(rad, angle.rad, rtol=1e-14)
+    np.testing.assert_allclose(stretched[0], velocity.rad, atol=1e-12)
+    np.testing.assert_allclose(stretched[1], velocity.mag.abs, rtol=1e-12)
+    np.testing.assert_allclose(stretched[2], velocity.dmag.abs, atol=1e-9)
@@ -0,0 +1,643 @@
+# -*- coding: utf-8 -*-
+"""
+
+Benchmarking the linear energy velocity of ttwean_for_ttcrpy against the exact
+energy velocity of the full ttwean package
+
+For each point of a grid of Thomsen parameters, wavetypes and stretch factors,
+the exact energy velocity is computed via the stiffness and the exact phase
+velocity (Berryman), stretched if so, and the linear energy velocity of
+TTWean.ttinit/ttvels is evaluated at the same energy angles. The relative
+error is kept as its maximum and rms, and the largest energy angle up to which
+it stays below TOLERANCE. Further, the run times of ttinit, ttvel and ttvels
+are measured. All goes into the JSON file OUTPUT, and a summary table is
+printed.
+
+With BATCH, the exact energy velocity of the whole grid is computed in one
+vectorized call of TTBatch.ttexact from ttwean_for_ttcrpy/ttbatch.py, which
+rebuilds the ttwean pipeline from Thomsen parameters to the stretched exact
+energy velocity from array operations, rather than point by point; so, the
+ttwean package is only needed with CHECK.
+Likewise, TTBatch rebuilds the setup of incidence angles and the exact
+stretch of a phase velocity from array operations, and their run times are
+measured against those of the ttwean package for OVERHEADNOS angles.
+
+Note, unless in BATCH mode without CHECK, the full ttwean package must be
+installed, e.g. via pip from the wheel in ttwean/; the directory ttwean/
+itself holds no package and is skipped by the import. The package requires
+scipy, matplotlib and IPython, and numpy < 2, as it still uses np.NAN. If it
+cannot be used, a message says why, and only the linear energy velocity is
+benchmarked: the timings, and in BATCH mode the accuracy, but no CHECK and
+no setup times of the package.
+
+"""
+
+
+# libraries to be imported
+import json
+import time
+import itertools
+import importlib
+import functools
+import numpy as np
+from ttwean_for_ttcrpy.ttwean import TTWean
+from ttwean_for_ttcrpy.ttbatch import TTBatch
+
+
+# ### change the "user-defined parameters" below as you see fit ###
+
+
+# medium
+VP0 = 1875.   # reference P-velocity
+VS0 = 826.    # reference S-velocity
+RHO = 2.      # density (irrelevant for velocities, but required)
+
+
+# parameter grid
+DELTAS = [-0.1, 0., 0.1, 0.2]
+EPSILONS = [0., 0.1, 0.2, 0.3]
+WAVETYPES = ["P", "SV"]
+GGGS = [0., 0.2, 0.5]
+
+
+# incidence phase angles (in degree) of the exact energy velocity
+START = 0.
+END = 60.
+NOS = 601
+
+
+# accuracy
+TOLERANCE = 1e-3   # acceptable relative error of the linear energy velocity
+
+
+# speed
+EVALUATIONS = 10 ** 6   # number of energy velocities timed
+LOOPS = 10 ** 5         # number of calls timed in a Python loop
+REPEAT = 5              # number of timings, of which the best is kept
+
+
+# setup overhead
+OVERHEADNOS = [91, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+OVERHEADPACKAGE = 10 ** 6   # largest number of angles timed with the ttwean
+                            # package as well; 0 for none
+
+
+# execution
+BATCH = True      # vectorized over the grid, otherwise point by point
+CHUNK = 0         # maximum number of velocities per vectorized step, 0 for
+                  # the whole grid in one step
+CHECK = 2         # number of grid points checked against the ttwean package
+
+
+# output
+OUTPUT = 'ttbench.json'
+ACCURACYPRINT = True   # print the accuracy of each grid point
+
+
+# ### benchmark ### benchmark ### benchmark ### benchmark ### benchmark ###
+
+
+@functools.cache
+def package():
+    """
+    Import the full ttwean package once, if usable.
+
+    Returns
+    -------
+    tw : module or None
+        the ttwean package; None, with a message why, if it cannot be used
+
+    """
+    # pylint:disable=invalid-name   # as abbreviated by the ttwean package
+    # import
+    # note, the directory ttwean/ next to this script imports as an empty
+    # namespace package if the package is not installed
+    try:
+        tw = importlib.import_module('ttwean')
+    except ImportError as error:
+        print(f"ttbench: ttwean package not importable ({error}); skipped")
+        return None
+    if not hasattr(tw, 'Thomsen'):
+        print("ttbench: ttwean package not installed; skipped")
+        return None
+    # check numpy
+    # note, the package fails on the first np.NAN only when called
+    if not hasattr(np, 'NAN'):
+        print("ttbench: ttwean package requires numpy < 2 (np.NAN); skipped")
+        return None
+    # return
+    return tw
+
+
+def exact(delta=None, epsilon=None, wavetype=None, ggg=None):
+    """
+    Compute the exact energy velocity with the full ttwean package.
+
+    Parameters
+    ----------
+    delta : float
+        Thomsen parameter delta
+    epsilon : float
+        Thomsen parameter epsilon
+    wavetype : char
+        "P" : P-wave
+        "SV" : S-wave
+    ggg : float
+        stretch factor
+
+    Returns
+    -------
+    rad : np.array
+        energy angles in radiant, stretched if so
+    vel : np.array
+        magnitudes of the exact energy velocity
+
+    """
+    # pylint:disable=invalid-name   # as abbreviated by the ttwean package
+    # import on demand, as not needed in batch mode
+    tw = package()
+    check = tw is not None
+    text = "exact: ttwean package required, see the message above!"
+    assert check, text
+    # stiffness
+    thomsen = (
+        tw.Thomsen().input_to_thomsen(
+            vp0=VP0, vs0=VS0, delta=delta, epsilon=epsilon, rho=RHO))
+    voigt = tw.Voigt().thomsen_to_voigt(thomsen=thomsen)
+    # exact phase velocity
+    angle = tw.Angle().input_to_angles(start=START, end=END, nos=NOS)
+    phase = (
+        tw.VoigtPhaseVelocity().voigt_to_exact_phase(
+            voigt=voigt, angle=angle, sign=tw.SIGN[wavetype]))
+    # exact energy velocity, stretched
+    energy = tw.ExactEnergyVelocity().exact_energy(phase=phase)
+    energy = energy.stretch(ggg=ggg)
+    # return
+    return energy.rad.flatten(), energy.mag.abs.flatten()
+
+
+def accuracy(delta=None, epsilon=None, wavetype=None, ggg=None):
+    """
+    Compute the error of the linear against the exact energy velocity.
+
+    Parameters
+    ----------
+    delta : float
+        Thomsen parameter delta
+    epsilon : float
+        Thomsen parameter epsilon
+    wavetype : char
+        "P" : P-wave
+        "SV" : S-wave
+    ggg : float
+        stretch factor
+
+    Returns
+    -------
+    record : dict
+        parameters and
+        'max', 'rms' : float
+            maximum and rms relative error
+        'angle' : float or None
+            largest energy angle (in degree) up to which the relative error
+            stays below TOLERANCE; None if not even at the first angle
+        note, where the energy velocity has cusps (SV-waves with epsilon <
+        delta), the linear energy velocity is not defined well, and its error
+        becomes meaningless
+
+    """
+    # exact energy velocity
+    rad, vel = exact(delta=delta, epsilon=epsilon, wavetype=wavetype, ggg=ggg)
+    # linear energy velocity at the same energy angles
+    vp0, vs0, sss = (
+        TTWean.ttinit(
+            vp0=VP0, vs0=VS0, delta=delta, epsilon=epsilon,
+            wavetype=wavetype, ggg=ggg))
+    linear = (
+        TTWean.ttvels(
+            vp0=vp0, vs0=vs0, sss=sss, wavetype=wavetype, angle=rad))
+    # relative error
+    error = np.abs(linear - vel) / vel
+    # reduce
+    record = reduce(rad=rad, error=error)
+    # return
+    return {
+        'delta': delta, 'epsilon': epsilon, 'wavetype': wavetype, 'ggg': ggg,
+        'max': float(record['max']),
+        'rms': float(record['rms']),
+        'angle': (
+            float(record['angle']) if np.isfinite(record['angle']) else None)}
+
+
+def reduce(rad=None, error=None):
+    """
+    Reduce relative errors over the energy angles along the last axis.
+
+    Parameters
+    ----------
+    rad : np.array ([... x NOS])
+        energy angles in radiant
+    error : np.array ([... x NOS])
+        relative errors
+
+    Returns
+    -------
+    record : dict of np.array ([...])
+        'max', 'rms' : maximum and rms relative error
+        'angle' : largest energy angle (in degree) up to which the relative
+            error stays below TOLERANCE; nan if not even at the first angle
+
+    """
+    # last angle before the first failure, if any
+    fail = ~(error < TOLERANCE)
+    last = np.where(np.any(fail, axis=-1), np.argmax(fail, axis=-1), NOS) - 1
+    # largest angle up to there
+    largest = np.maximum.accumulate(np.abs(rad), axis=-1)
+    largest = (
+        np.take_along_axis(
+            largest, np.maximum(last, 0)[..., None], axis=-1)[..., 0])
+    # return
+    return {
+        'max': np.max(error, axis=-1),
+        'rms': np.sqrt(np.mean(error * error, axis=-1)),
+        'angle': np.where(last >= 0, np.rad2deg(largest), np.nan)}
+
+
+def batch(wavetype=None):
+    """
+    Compute the error of the linear against the exact energy velocity over
+    the whole parameter grid of a wavetype, vectorized.
+
+    Parameters
+    ----------
+    wavetype : char
+        "P" : P-wave
+        "SV" : S-wave
+
+    Returns
+    -------
+    records : list of dict
+        see accuracy, for all grid points
+
+    """
+    # parameter grid, media along the first axis
+    grid = np.meshgrid(DELTAS, EPSILONS, GGGS, indexing='ij')
+    delta, epsilon, ggg = (np.reshape(axis, (-1, 1)) for axis in grid)
+    # incidence phase angles
+    rad = TTBatch.ttangles(start=START, end=END, nos=NOS)[1][:, 0]
+    # compute in one step, or in steps of at most CHUNK velocities
+    step = max(CHUNK // NOS, 1) if CHUNK else len(delta)
+    reduced = []
+    for first in range(0, len(delta), step):
+        part = slice(first, first + step)
+        # exact energy velocity
+        energy, vel = (
+            TTBatch.ttexact(
+                vp0=VP0, vs0=VS0, rho=RHO, delta=delta[part],
+                epsilon=epsilon[part], wavetype=wavetype, ggg=ggg[part],
+                rad=rad))
+        # linear energy velocity at the same energy angles
+        vp0, vs0, sss = (
+            TTWean.ttinit(
+                vp0=VP0, vs0=VS0, delta=delta[part], epsilon=epsilon[part],
+                wavetype=wavetype, ggg=ggg[part]))
+        linear = (
+            TTWean.ttvels(
+                vp0=vp0, vs0=vs0, sss=sss, wavetype=wavetype, angle=energy))
+        # relative error
+        reduced.append(
+            reduce(rad=energy, error=np.abs(linear - vel) / vel))
+    # assemble
+    record = {
+        key: np.concatenate([item[key] for item in reduced])
+        for key in ('max', 'rms', 'angle')}
+    # return
+    return [
+        {
+            'delta': float(delta[iii, 0]), 'epsilon': float(epsilon[iii, 0]),
+            'wavetype': wavetype, 'ggg': float(ggg[iii, 0]),
+            'max': float(record['max'][iii]),
+            'rms': float(record['rms'][iii]),
+            'angle': (
+                float(record['angle'][iii])
+                if np.isfinite(record['angle'][iii]) else None)}
+        for iii in range(len(delta))]
+
+
+def check(records=None):
+    """
+    Check batched against point-by-point results of the ttwean package.
+
+    Parameters
+    ----------
+    records : list of dict
+        see batch
+
+    Returns
+    -------
+    deviation : float
+        largest absolute deviation of the maximum relative error at CHECK
+        grid points spread over the grid
+
+    """
+    # grid points
+    indices = np.unique(np.linspace(0, len(records) - 1, CHECK, dtype=int))
+    # compare
+    deviation = 0.
+    for index in indices:
+        record = records[index]
+        point = (
+            accuracy(
+                delta=record['delta'], epsilon=record['epsilon'],
+                wavetype=record['wavetype'], ggg=record['ggg']))
+        deviation = max(deviation, abs(point['max'] - record['max']))
+    # return
+    return deviation
+
+
+def timer(func=None, number=None, prepare=None):
+    """
+    Time a function as the best of REPEAT runs.
+
+    Parameters
+    ----------
+    func : callable
+        function without arguments, or of the output of prepare
+    number : int
+        number of evaluations per run
+    prepare : callable, default is None
+        function preparing the argument of func afresh for each run, untimed
+
+    Returns
+    -------
+    time : float
+        seconds per million evaluations
+
+    """
+    # best run
+    best = np.inf
+    for _ in range(REPEAT):
+        args = () if prepare is None else (prepare(),)
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    # return
+    return best / number * 10 ** 6
+
+
+def speed():
+    """
+    Measure the run times of ttinit, ttvel and ttvels.
+
+    Returns
+    -------
+    record : dict
+        seconds per million evaluations of
+        'ttinit' : ttinit in a Python loop
+        'ttinit family' : ttinit for an array of stretch factors
+        'ttvel' : ttvel in a Python loop
+        'ttvels' : ttvels for an array of cells
+        'ttvels table' : ttvels from a table by cell rows
+        'ttstencil' : a gather from the lookup of ttstencil
+        note, main adds 'grid', the accuracy over the grid per million
+        exact and linear energy velocities
+
+    """
+    # random cells and angles
+    rng = np.random.default_rng(0)
+    angle = rng.uniform(-np.pi / 2., np.pi / 2., EVALUATIONS)
+    stencil = np.linspace(-np.pi / 2., np.pi / 2., 16)
+    direction = rng.integers(0, len(stencil), EVALUATIONS)
+    row = rng.integers(0, len(DELTAS), EVALUATIONS)
+    out = np.empty(EVALUATIONS)
+    # parameters
+    init = dict(vp0=VP0, vs0=VS0, delta=DELTAS[-1], epsilon=EPSILONS[-1])
+    vp0, vs0, sss = TTWean.ttinit(**init, ggg=GGGS[-1])
+    table, _ = (
+        TTWean.tttable(
+            vp0=VP0, vs0=VS0, delta=DELTAS, epsilon=EPSILONS[-1],
+            wavetype=("P",), ggg=GGGS[-1]))
+    lookup = TTWean.ttstencil(table=table, angle=stencil)
+    cells = np.full(EVALUATIONS, fill_value=vp0)
+    family = np.linspace(GGGS[0], GGGS[-1], EVALUATIONS)
+    # functions timed
+    funcs = {
+        'ttinit': (
+            lambda: [
+                TTWean.ttinit(**init, ggg=GGGS[-1]) for _ in range(LOOPS)],
+            LOOPS),
+        'ttinit family': (
+            lambda: TTWean.ttinit(**init, ggg=family),
+            EVALUATIONS),
+        'ttvel': (
+            lambda: [
+                TTWean.ttvel(vp0=vp0, vs0=vs0, sss=sss, angle=angle[iii])
+                for iii in range(LOOPS)],
+            LOOPS),
+        'ttvels': (
+            lambda: TTWean.ttvels(
+                vp0=cells, vs0=cells, sss=sss, angle=angle, out=out),
+            EVALUATIONS),
+        'ttvels table': (
+            lambda: TTWean.ttvels(
+                table=table, medium=row, angle=angle, out=out),
+            EVALUATIONS),
+        'ttstencil': (
+            lambda: np.take(
+                lookup.ravel(), row * len(stencil) + direction, out=out),
+            EVALUATIONS)}
+    # return
+    return {
+        name: timer(func=func, number=number)
+        for name, (func, number) in funcs.items()}
+
+
+def overhead():
+    """
+    Measure the setup time of incidence angles and of an exact stretch.
+
+    Returns
+    -------
+    records : list of dict
+        per number of angles, seconds per call of
+        'angles', 'stretch' : TTBatch.ttangles and ttstretch
+        'package angles', 'package stretch' : Angle.input_to_angles and
+            ExactPhaseVelocity.exact_stretch, up to OVERHEADPACKAGE angles
+        and
+        'deviation' : largest absolute deviation of the stretched angles
+            from those of the ttwean package
+
+    """
+    # pylint:disable=cell-var-from-loop   # called within the loop
+    # pylint:disable=invalid-name         # as abbreviated in ttwean
+    # import on demand
+    tw = package() if OVERHEADPACKAGE else None
+    # all quadrants, stretched to near-isotropy
+    start, end, ggg = -180., 180., GGGS[-1]
+    # time
+    records = []
+    for nos in OVERHEADNOS:
+        # angles and stretch
+        record = {'nos': nos}
+        record['angles'] = (
+            timer(
+                func=lambda: (
+                    TTBatch.ttangles(start=start, end=end, nos=nos)),
+                number=10 ** 6))
+        rad = TTBatch.ttangles(start=start, end=end, nos=nos)[1]
+        mag = np.full_like(rad, fill_value=VP0)
+        dmag = np.zeros_like(rad)
+        record['stretch'] = (
+            timer(
+                func=lambda: (
+                    TTBatch.ttstretch(rad=rad, mag=mag, dmag=dmag, ggg=ggg)),
+                number=10 ** 6))
+        # the same with the ttwean package
+        if tw is not None and nos <= OVERHEADPACKAGE:
+            record['package angles'] = (
+                timer(
+                    func=lambda: (
+                        tw.Angle().input_to_angles(
+                            start=start, end=end, nos=nos)),
+                    number=10 ** 6))
+            # fresh phase velocity for each stretch
+            def phase():
+                velocity = tw.VoigtPhaseVelocity()   # an ExactPhaseVelocity
+                velocity.rad = rad.copy()
+                velocity.mag.abs = mag.copy()
+                velocity.dmag.abs = dmag.copy()
+                velocity.vp0, velocity.vs0 = VP0, VS0
+                return velocity
+            record['package stretch'] = (
+                timer(
+                    func=lambda velocity: velocity.exact_stretch(ggg=ggg),
+                    number=10 ** 6, prepare=phase))
+            record['deviation'] = (
+                float(
+                    np.max(np.abs(
+                        phase().exact_stretch(ggg=ggg).rad
+                        -
+                        TTBatch.ttstretch(
+                            rad=rad, mag=mag, dmag=dmag, ggg=ggg)[0]))))
+        records.append(record)
+    # return
+    return records
+
+
+def info(timing=None, records=None, setups=None):
+    """
+    Print run times, setup overhead and accuracy.
+
+    Parameters
+    ----------
+    timing : dict
+        see speed
+    records : list of dict
+        see accuracy
+    setups : list of dict
+        see overhead
+
+    Returns
+    -------
+    none
+
+    """
+    # run times
+    print('\nrun time in seconds per million evaluations:')
+    width = max(len(name) for name in timing)
+    for name, value in timing.items():
+        print(f"{name:>{width}s} {value:10.4f}")
+    # setup overhead
+    print('\nsetup time in seconds per call:')
+    names = ['angles', 'stretch', 'package angles', 'package stretch']
+    print(f"{'nos':>10s}" + ''.join(f"{name:>16s}" for name in names))
+    for setup in setups:
+        print(
+            f"{setup['nos']:10d}" +
+            ''.join(
+                f"{setup[name]:16.3e}" if name in setup else f"{'-':>16s}"
+                for name in names))
+    # accuracy
+    if not ACCURACYPRINT:
+        return
+    print(
+        '\nrelative error of the linear energy velocity' +
+        f' (angle: largest energy angle with error < {TOLERANCE:.0e}):')
+    names = ['wavetype', 'delta', 'epsilon', 'ggg', 'max', 'rms', 'angle']
+    print(''.join(f"{name:>10s}" for name in names))
+    for record in records:
+        angle = record['angle']
+        print(
+            f"{record['wavetype']:>10s}" +
+            f"{record['delta']:10.3f}" +
+            f"{record['epsilon']:10.3f}" +
+            f"{record['ggg']:10.3f}" +
+            f"{record['max']:10.2e}" +
+            f"{record['rms']:10.2e}" +
+            (f"{angle:10.2f}" if angle is not None else f"{'-':>10s}"))
+
+
+def main():
+    """
+    Benchmark speed, setup overhead and accuracy, and write all to OUTPUT.
+
+    Returns
+    -------
+    result : dict
+        'timing' : dict
+            see speed
+        'overhead' : list of dict
+            see overhead
+        'check' : float or None
+            see check
+        'accuracy' : list of dict
+            see accuracy
+
+    """
+    # accuracy over the parameter grid
+    # note, point by point requires the ttwean package
+    start = time.perf_counter()
+    if BATCH:
+        records = [
+            record for wavetype in WAVETYPES
+            for record in batch(wavetype=wavetype)]
+    elif package() is None:
+        records = []
+    else:
+        records = [
+            accuracy(delta=delta, epsilon=epsilon, wavetype=wavetype, ggg=ggg)
+            for wavetype, delta, epsilon, ggg in itertools.product(
+                WAVETYPES, DELTAS, EPSILONS, GGGS)]
+    grid = time.perf_counter() - start
+    # speed
+    timing = speed()
+    if records:
+        timing['grid'] = grid / (len(records) * NOS) * 10 ** 6
+    setups = overhead()
+    # check batch against the ttwean package
+    deviation = (
+        check(records=records)
+        if BATCH and CHECK and package() is not None else None)
+    # write
+    result = {
+        'setup': {
+            'vp0': VP0, 'vs0': VS0, 'start': START, 'end': END, 'nos': NOS,
+            'tolerance': TOLERANCE, 'evaluations': EVALUATIONS,
+            'loops': LOOPS, 'repeat': REPEAT, 'batch': BATCH},
+        'timing': timing,
+        'overhead': setups,
+        'check': deviation,
+        'accuracy': records}
+    with open(OUTPUT, 'w', encoding='utf-8') as outfile:
+        json.dump(result, outfile, indent=1)
+    # print
+    info(timing=timing, records=records, setups=setups)
+    # return
+    return result
+
+
+###############################################################################
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+# -*- coding: utf-8 -*-
+"""
+ttbatch: the ttwean pipeline from Thomsen parameters to the exact energy
+velocity, batched over media
+
+The full ttwean package computes one medium, wavetype and stretch per call,
+holding the stiffness and the velocity parameters in [7x7] and [5x1] arrays.
+The class TTBatch below rebuilds the same steps from array operations; so,
+Thomsen parameters, reference velocities, densities and stretch factors are
+arrays broadcasting against each other like any NumPy operation, and a whole
+grid of media is computed in one call. Typically, the parameters of the media
+run along a leading axis, [n x 1], and the incidence angles along the last
+one, [NOS].
+
+Besides, TTBatch sets up incidence angles and stretches an exact phase
+velocity, as Angle.input_to_angles and ExactPhaseVelocity.exact_stretch of the
+package, but from array operations instead of loops; the package itself is
+left unchanged.
+
+Only numpy is needed; the ttwean package is not.
+
+"""
+
+
+# ttvoigt   convert Thomsen parameters to stiffness, as Voigt.thomsen_to_voigt
+# ttphase   compute the exact phase velocity and its derivative from the
+#           stiffness, as VoigtPhaseVelocity.voigt_to_exact_phase
+# ttenergy  compute the exact energy velocity from the phase velocity, and
+#           stretch it, as ExactEnergyVelocity.exact_energy and stretch
+# ttexact   chain ttvoigt, ttphase and ttenergy in one call
+# ttpara1   convert Thomsen parameters to squared and linear phase-velocity
+#           parameters, stretched if so, as Para1.thomsen_to_p_para1,
+#           thomsen_to_sv_para1 and stretch_para1
+# ttpara2   convert phase-velocity parameters to squared and linear
+#           energy-velocity parameters, as Para2.para1_to_para2
+# ttangles  set up equally spaced incidence angles, as Angle.input_to_angles
+# ttstretch stretch an exact phase velocity and its derivative, as
+#           ExactPhaseVelocity.exact_stretch
+
+# Python imports
+import numpy as np   # numpy
+
+# ttwean_for_ttcrpy imports
+from .ttwean import TTWean
+
+
+class TTBatch():
+    """
+    Characterize exact energy velocity for arrays of media.
+
+    """
+
+    # initialize
+    def __init__(self):
+        pass
+
+    # convert Thomsen parameters to stiffness
+    @staticmethod
+    def ttvoigt(
+            vp0:np.array=None, vs0:np.array=None, rho:np.array=None,
+            delta:np.array=0., epsilon:np.array=0.) -> dict:
+        """
+        Convert Thomsen parameters to stiffness elements.
+
+        Parameters
+        ----------
+        vp0 : float or np.array
+            reference P-velocity
+        vs0 : float or np.array
+            reference S-velocity
+        rho : float or np.array
+            density (irrelevant for velocities, but required)
+        delta : float or np.array, default is 0.
+            Thomsen parameter delta
+        epsilon : float or np.array, default is 0.
+            Thomsen parameter epsilon
+
+        Returns
+        -------
+        voigt : dict of np.array
+            'c11', 'c13', 'c33', 'c44' : stiffness elements, for a positive
+            sign of c13 + c44
+            'rho' : density
+            note, nan where delta is out of range; stability is not checked
+
+        """
+        # pylint:disable=too-many-arguments
+        # stiffness
+        c33 = vp0 ** 2 * rho
+        c44 = vs0 ** 2 * rho
+        c13 = np.sqrt((c33 - c44) * (c33 - c44 + 2. * c33 * delta)) - c44
+        c11 = c33 * (1. + 2. * epsilon)
+        # return
+        return {'c11': c11, 'c13': c13, 'c33': c33, 'c44': c44, 'rho': rho}
+
+    # compute the exact phase velocity
+    @staticmethod
+    def ttphase(
+            voigt:dict=None, rad:np.array=None,
+            wavetype:str="P") -> tuple:
+        """
+        Compute the exact phase velocity and its derivative.
+
+        Parameters
+        ----------
+        voigt : dict of np.array
+            see ttvoigt
+        rad : float or np.array
+            incidence phase angles in radiant
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+
+        Returns
+        -------
+        mag : np.array
+            magnitude of the phase velocity
+        dmag : np.array
+            its derivative with respect to the phase angle
+
+        """
+        # pylint:disable=too-many-locals   # following ttwean
+        # wavetype
+        sign = {"P": +1., "SV": -1.}[TTWean.ttwave(wavetype=wavetype)]
+        # shortcut trigs
+        sin = np.sin(rad)
+        cos = np.cos(rad)
+        sin2 = sin * sin
+        cos2 = cos * cos
+        dcos = cos2 - sin2
+        dsin = 2. * sin * cos
+        dsin2 = dsin * dsin
+        # shortcut elasticity
+        c11, c13, c33, c44, rho = (
+            voigt[name] for name in ('c11', 'c13', 'c33', 'c44', 'rho'))
+        # magnitude of the phase velocity
+        ppp12 = (
+            ((c11 - c44) * sin2 - (c33 - c44) * cos2) ** 2
+            +
+            (c13 + c44) ** 2 * dsin2)
+        ppp3 = c11 * sin2 + c33 * cos2 + c44
+        mag = np.sqrt((ppp3 + sign * np.sqrt(ppp12)) / (2. * rho))
+        # its derivative
+        dppp12 = (
+            (c11 + c33 - 2. * c44) *
+            (c11 - c33 - (c11 + c33 - 2. * c44) * dcos) *
+            dsin
+            +
+            4. * (c13 + c44) ** 2 * dsin * dcos)
+        dppp3 = (c11 - c33) * dsin
+        dmag = (
+            ((sign * dppp12) / (2. * np.sqrt(ppp12)) + dppp3)
+            /
+            (4. * rho * mag))
+        # return
+        return mag, dmag
+
+    # compute the exact energy velocity
+    @staticmethod
+    def ttenergy(
+            rad:np.array=None, mag:np.array=None, dmag:np.array=None,
+            ggg:np.array=0.) -> tuple:
+        """
+        Compute the exact energy velocity (Berryman), stretched if so.
+
+        Parameters
+        ----------
+        rad : float or np.array
+            incidence phase angles in radiant
+        mag, dmag : np.array
+            see ttphase
+        ggg : float or np.array, default is 0. (neutral)
+            stretch factor
+
+        Returns
+        -------
+        rad : np.array
+            energy angles in radiant, stretched
+        mag : np.array
+            magnitude of the energy velocity, stretched
+
+        """
+        # energy velocity
+        tan = np.tan(rad)
+        fak = dmag / mag
+        rad = np.arctan((tan + fak) / (1. - tan * fak))
+        mag = np.sqrt(mag * mag + dmag * dmag)
+        # stretch the vertical component
+        xxx = mag * np.sin(rad)
+        zzz = mag * np.cos(rad) * np.sqrt(1. + ggg)
+        mag = np.sqrt(xxx ** 2 + zzz ** 2)
+        rad = np.arctan(1. / np.sqrt(1. + ggg) * np.tan(rad))
+        # return
+        return rad, mag
+
+    # compute the exact energy velocity from Thomsen parameters
+    @staticmethod
+    def ttexact(
+            vp0:np.array=None, vs0:np.array=None, rho:np.array=None,
+            delta:np.array=0., epsilon:np.array=0., wavetype:str="P",
+            ggg:np.array=0., rad:np.array=None) -> tuple:
+        """
+        Compute the exact energy velocity from Thomsen parameters in one call.
+
+        Typically, with the parameters of N media as [N x 1] arrays and NOS
+        incidence phase angles,
+            rad, mag = (
+                ttexact(
+                    vp0=VP0, vs0=VS0, rho=RHO, delta=DELTA, epsilon=EPSILON,
+                    wavetype=WAVETYPE, ggg=GGG, rad=ANGLE))
+        gives [N x NOS] energy angles and velocities.
+        Note, all capital for user-defined arrays.
+
+        Parameters
+        ----------
+        vp0, vs0, rho, delta, epsilon : float or np.array
+            see ttvoigt
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+        ggg : float or np.array, default is 0. (neutral)
+            stretch factor
+        rad : float or np.array
+            incidence phase angles in radiant
+
+        Returns
+        -------
+        rad : np.array
+            energy angles in radiant, stretched
+        mag : np.array
+            magnitude of the energy velocity, stretched
+
+        """
+        # pylint:disable=too-many-arguments
+        # stiffness
+        voigt = (
+            TTBatch.ttvoigt(
+                vp0=vp0, vs0=vs0, rho=rho, delta=delta, epsilon=epsilon))
+        # exact phase velocity
+        mag, dmag = TTBatch.ttphase(voigt=voigt, rad=rad, wavetype=wavetype)
+        # exact energy velocity, stretched
+        rad, mag = TTBatch.ttenergy(rad=rad, mag=mag, dmag=dmag, ggg=ggg)
+        # return
+        return rad, mag
+
+    # convert Thomsen parameters to phase-velocity parameters
+    @staticmethod
+    def ttpara1(
+            vp0:np.array=None, vs0:np.array=None, delta:np.array=0.,
+            epsilon:np.array=0., wavetype:str="P",
+            ggg:np.array=0.) -> dict:
+        """
+        Convert Thomsen parameters to phase-velocity parameters.
+
+        v^2 = v0^2 * (1 + r2 * sin(theta)^2 + r4 * sin(theta)^4)   # squared
+        v = v0 * (1 + o2 * sin(theta)^2 + o4 * sin(theta)^4)       # linear
+
+        Parameters
+        ----------
+        vp0, vs0, delta, epsilon : float or np.array
+            see ttvoigt
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+        ggg : float or np.array, default is 0. (neutral)
+            stretch factor
+
+        Returns
+        -------
+        para1 : dict of np.array
+            'vp0', 'vs0' : reference velocities, stretched
+            'r2', 'r4' : squared phase-velocity parameters
+            'o2', 'o4' : linear phase-velocity parameters
+
+        """
+        # pylint:disable=too-many-arguments
+        # check wavetype
+        TTWean.ttwave(wavetype=wavetype)
+        # shortcuts for computing squared phase-velocity parameters
+        vps2 = (vp0 / vs0) ** 2
+        fac = 1. + 2. * vps2 / (vps2 - 1.) * delta
+        # compute squared phase-velocity parameters for a qP-wave
+        if wavetype == "P":
+            rrr2 = 2. * delta
+            rrr4 = 2. * (epsilon - delta) * fac
+        # compute squared phase-velocity parameters for a qSV-wave
+        if wavetype == "SV":
+            rrr2 = 2. * vps2 * (epsilon - delta)
+            rrr4 = -1. * rrr2 * fac
+        # stretch (neutral for ggg = 0.)
+        vp0 = vp0 * np.sqrt(1. + ggg)
+        vs0 = vs0 * np.sqrt(1. + ggg)
+        rrr2 = (rrr2 - ggg) / (1. + ggg)
+        rrr4 = rrr4 / ((1. + ggg) ** 2)
+        # return with linear phase-velocity parameters
+        return {
+            'vp0': vp0, 'vs0': vs0, 'r2': rrr2, 'r4': rrr4,
+            'o2': rrr2 / 2., 'o4': -1. * rrr2 ** 2 / 8. + rrr4 / 2.}
+
+    # convert phase-velocity parameters to energy-velocity parameters
+    @staticmethod
+    def ttpara2(para1:dict=None) -> dict:
+        """
+        Convert phase-velocity parameters to energy-velocity parameters.
+
+        w^2 = w0^2 * (1 + t2 * sin(phi)^2 + t4 * sin(phi)^4)   # squared
+        w = w0 * (1 + s2 * sin(phi)^2 + s4 * sin(phi)^4)       # linear
+
+        Parameters
+        ----------
+        para1 : dict of np.array
+            see ttpara1
+
+        Returns
+        -------
+        para2 : dict of np.array
+            'vp0', 'vs0' : reference velocities, as given
+            't2', 't4' : squared energy-velocity parameters
+            's2', 's4' : linear energy-velocity parameters, as the record SSS
+            of TTWean.ttinit
+
+        """
+        # compute squared energy-velocity parameters
+        rrr2 = para1['r2']
+        ttt2 = rrr2 / (1. + rrr2)
+        ttt4 = (
+            (rrr2 ** 2 * (1. + rrr2) ** 2 + para1['r4'])
+            /
+            (1. + rrr2) ** 4)
+        # return with linear energy-velocity parameters
+        return {
+            'vp0': para1['vp0'], 'vs0': para1['vs0'], 't2': ttt2, 't4': ttt4,
+            's2': ttt2 / 2., 's4': -1. * ttt2 ** 2 / 8. + ttt4 / 2.}
+
+    # set up incidence angles
+    @staticmethod
+    def ttangles(
+            start:float=None, end:float=None, nos:int=None) -> tuple:
+        """
+        Set up equally spaced incidence angles.
+
+        Parameters
+        ----------
+        start : float
+            start of angle series in degree
+        end : float
+            end of angle series in degree
+        nos : int
+            number of angles
+
+        Returns
+        -------
+        grad : np.array ([nos x 1])
+            angles in degree
+        rad : np.array ([nos x 1])
+            angles in radiant
+
+        """
+        # check
+        check = nos >= 1
+        text = f"TTBatch.ttangles: nos {nos} !> 1!"
+        assert check, text
+        check = start < end if nos > 1 else start == end
+        text = f"TTBatch.ttangles: start {start} and end {end} mismatch nos!"
+        assert check, text
+        # generate the angle series as column vector
+        grad = np.linspace(float(start), float(end), int(nos)).reshape(-1, 1)
+        rad = np.deg2rad(grad)
+        # return
+        return grad, rad
+
+    # stretch an exact phase velocity
+    @staticmethod
+    def ttstretch(
+            rad:np.array=None, mag:np.array=None, dmag:np.array=None,
+            ggg:np.array=0.) -> tuple:
+        """
+        Stretch an exact phase velocity and its derivative.
+
+        Parameters
+        ----------
+        rad : np.array
+            phase angles in radiant
+        mag : np.array
+            magnitude of the phase velocity
+        dmag : np.array
+            its derivative with respect to the phase angle
+        ggg : float or np.array, default is 0. (neutral)
+            stretch factor
+
+        Returns
+        -------
+        rad, mag, dmag : np.array
+            stretched as given
+            note, the reference velocities stretch by np.sqrt(1. + ggg)
+
+        """
+        # stretch magnitude
+        sin = np.sin(rad)
+        fac = 1. + ggg * sin * sin
+        mag = mag * np.sqrt((1. + ggg) / fac)
+        dmag = dmag * np.sqrt((1. + ggg) / fac)
+        dmag -= ggg * sin * np.cos(rad) / fac * mag
+        # stretch phase angle, keeping it in the quadrant beyond +/-90 degree
+        corr = (
+            np.where(
+                rad > np.pi / 2., np.pi,
+                np.where(rad < -np.pi / 2., -np.pi, 0.)))
+        rad = np.arctan(np.sqrt(1. + ggg) * np.tan(rad)) + corr
+        # return
+        return rad, mag, dmag
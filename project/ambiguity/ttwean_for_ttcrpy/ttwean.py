@@ -13,8 +13,9 @@ The software repository is https://github.com/groupeLIAMG/ttcr
 
 You can use the functions ttinit and ttvel as part of the entire ttwean
 package, which can be installed via pip ttwean...whl. However, for use
-specifically with ttcrpy only you can safely rip out the functions ttinit and
-ttvel below and use them independently outside that package.
+specifically with ttcrpy only you can safely rip out the class TTWean below,
+together with the record type SSS, and use it independently outside that
+package.
 
 My software repository is https://github.com/bjornrommel/steinkauz under the
 project Subsurface-Velocity Ambiguity.
@@ -31,8 +32,23 @@ project Subsurface-Velocity Ambiguity.
 # ttvel    compute the energy velocity for each medium, wavetype, or incidence
 #          angle; in practice, probably for each cell, incidence angle and time
 #          step
+# tttable  initialize energy-velocity parameters as ttinit, but for arrays of
+#          media, wavetypes and stretches at once into one table
+# ttvels   compute the energy velocities as ttvel, but for arrays of cells
+#          and incidence angles in one call, optionally from the table
+# ttstencil  tabulate the energy velocities of all media at the fixed stencil
+#          directions of a grid solver once; each time step then merely looks
+#          them up
+# ttmodel  expand a labelled model grid into per-cell parameter arrays for
+#          ttcrpy, vectorized over all cells
+# ttcompact  convert energy-velocity parameters from the old [5x1] arrays
+# ttexpand   convert energy-velocity parameters to the old [5x1] arrays
+# ttwave   check a wavetype is one of WAVETYPES
+# TTEval   an immutable energy-velocity evaluator per medium, wavetype and
+#          stretch, for sharing between the threads of a ray tracer
 
 # Python imports
+import math          # math
 import numpy as np   # numpy
 
 
@@ -51,6 +67,23 @@ WAVETYPE = "P"              # "P"-wave
 ANGLE = 30.                 # incidence angle (phase=energy angle)
 
 
+# linear energy-velocity parameters s2 and s4 of a medium
+# note, s0=1 is implied, s1 and s3 are not in use; so, a record takes 2 floats
+# against 5 floats plus an array header of the old [5x1] arrays, and a
+# contiguous array of records stores a grid without any per-cell object
+SSS = np.dtype([("s2", float), ("s4", float)])
+
+
+# isotropic linear energy-velocity parameters
+# note, read-only, as shared by every call defaulting to it
+ISOTROPY = np.zeros((), dtype=SSS)
+ISOTROPY.flags.writeable = False
+
+
+# wavetypes supported
+WAVETYPES = ("P", "SV")
+
+
 class TTWean():
     """
     Characterize energy velocity for simulation with ttcpry.
@@ -61,12 +94,42 @@ class TTWean():
     def __init__(self):
         pass
 
+    # check the wavetype
+    @staticmethod
+    def ttwave(wavetype:str=None) -> str:
+        """
+        Check a wavetype.
+
+        Parameters
+        ----------
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+
+        Raises
+        ------
+        AssertionError
+            if the wavetype is not one of WAVETYPES
+
+        Returns
+        -------
+        wavetype : char
+            as given
+
+        """
+        # check
+        check = wavetype in WAVETYPES
+        text = f"TTWean: wavetype {wavetype!r} is not one of {WAVETYPES}!"
+        assert check, text
+        # return
+        return wavetype
+
     # set the energy-velocity parameters
     @staticmethod
     def ttinit(
             vp0:float=None, vs0:float=None, delta:float=0.,
-            epsilon:float=0., wavetype:str="P", ggg:float=0.) -> (float,
-            float, np.array):
+            epsilon:float=0., wavetype:str="P",
+            ggg:np.array=0.) -> (float, float, np.array):
         """
         Precompute the linear energy-velocity parameters once.
 
@@ -92,6 +155,12 @@ class TTWean():
         Any stretch modifies P and SV-velocities: so, be careful not to
         overwrite your in- and output variable.
         Use the same wavetype for ttinit and ttray.
+        For an ambiguity scan, an array of stretch factors returns the whole
+        stretch family at once,
+            vp0[stretch], vs0[stretch], sss[stretch] = (
+                ttinit(
+                    vp0=VP0, vs0=VS0, delta=DELTA, epsilon=EPSILON,
+                    wavetype="P" or wavetype="SV", ggg=GGGS))
 
         Parameters
         ----------
@@ -106,61 +175,158 @@ class TTWean():
         wavetype : char
             "P" : P-wave
             "SV" : S-wave
-        ggg : float, default is 0. (neutral)
-            stretch factor
+        ggg : float or np.array, default is 0. (neutral)
+            stretch factor, or stretch factors of a family
+        note, arrays of delta, epsilon and ggg broadcast against each other
 
         Returns
         -------
-        vp0, vs0 : float
-            P- and SV-reference velocities: modified only if stretched
-        sss : np.array ([5x1])
-            linear energy-velocity parameters
+        vp0, vs0 : float or np.array
+            P- and SV-reference velocities: modified only if stretched; per
+            stretch factor if an array
+        sss : np.array (record of SSS, or of the broadcast shape)
+            linear energy-velocity parameters s2 and s4
+            note, use ttexpand for the old [5x1] array
 
         """
         # pylint:disable=too-many-arguments
+        # check wavetype
+        TTWean.ttwave(wavetype=wavetype)
         # shortcuts for computing squared phase-velocity parameters
         vps2 = (vp0 / vs0) ** 2
         fac = 1. + 2. * vps2 / (vps2 - 1.) * delta
-        # define squared phase-velocity parameters
-        rrr =  np.full((5,1), fill_value=np.NAN, dtype=float)
-        rrr[0,0] = 1.
         # compute squared phase-velocity parameters for a qP-wave
         if wavetype == "P":
-            rrr[2,0] = 2. * delta
-            rrr[4,0] = 2. * (epsilon - delta) * fac
+            rrr2 = 2. * delta
+            rrr4 = 2. * (epsilon - delta) * fac
         # compute squared phase-velocity parameters for a qSV-wave
         if wavetype == "SV":
-            rrr[2,0] = 2. * vps2 * (epsilon - delta)
-            rrr[4,0] = -1. * rrr[2,0] * fac
-        # stretch
-        if ggg != 0.:
+            rrr2 = 2. * vps2 * (epsilon - delta)
+            rrr4 = -1. * rrr2 * fac
+        # stretch (always for a family, though neutral where ggg = 0.)
+        ggg = np.asarray(ggg, dtype=float)
+        if ggg.ndim or ggg != 0.:
             # stretch reference velocity
-            vp0 *= np.sqrt(1. + ggg)
-            vs0 *= np.sqrt(1. + ggg)
+            vp0 = vp0 * np.sqrt(1. + ggg)
+            vs0 = vs0 * np.sqrt(1. + ggg)
             # stretch squared phase-velocity parameters
-            rrr[2,0] = (rrr[2,0] - ggg) / (1. + ggg)
-            rrr[4,0] = rrr[4,0] / ((1. + ggg) ** 2)
+            rrr2 = (rrr2 - ggg) / (1. + ggg)
+            rrr4 = rrr4 / ((1. + ggg) ** 2)
         # compute squared energy-velocity parameters
-        ttt =  np.full((5,1), fill_value=np.NAN, dtype=float)
-        ttt[0,0] = 1.
-        ttt[2,0] = rrr[2,0] / (1. + rrr[2,0])
-        ttt[4,0] = (
-            (rrr[2,0] ** 2 * (1. + rrr[2,0]) ** 2 + rrr[4,0])
+        ttt2 = rrr2 / (1. + rrr2)
+        ttt4 = (
+            (rrr2 ** 2 * (1. + rrr2) ** 2 + rrr4)
             /
-            (1. + rrr[2,0]) ** 4)
+            (1. + rrr2) ** 4)
         # compute linear energy velocity parameters
-        sss =  np.full((5,1), fill_value=np.NAN, dtype=float)
-        sss[0,0] = 1.
-        sss[2,0] = ttt[2,0] / 2.
-        sss[4,0] = -1. * ttt[2,0] ** 2 / 8. + ttt[4,0] / 2.
+        sss = np.zeros(np.shape(ttt2), dtype=SSS)
+        sss["s2"] = ttt2 / 2.
+        sss["s4"] = -1. * ttt2 ** 2 / 8. + ttt4 / 2.
         # return
         return vp0, vs0, sss
 
+    # set the energy-velocity parameters of all media, wavetypes, stretches
+    @staticmethod
+    def tttable(
+            vp0:np.array=None, vs0:np.array=None, delta:np.array=0.,
+            epsilon:np.array=0., wavetype:tuple=("P", "SV"),
+            ggg:np.array=0.) -> (np.array, np.array):
+        """
+        Precompute the linear energy-velocity parameters of a model at once.
+
+        tttable is ttinit for arrays of media, a tuple of wavetypes and an
+        array of stretch factors, all computed in one go. Each entry of the
+        table holds the reference velocity of its wavetype, s2 and s4. Cells
+        reference entries by the index map instead of holding parameters.
+
+        Typically,
+            table, index = (
+                tttable(
+                    vp0=VP0S, vs0=VS0S, delta=DELTAS, epsilon=EPSILONS,
+                    wavetype=("P", "SV"), ggg=GGGS))
+            row[cell] = index[medium[cell], wave, stretch]
+            vel[cell] = (
+                ttvels(
+                    table=table, medium=row[cell], wavetype=wavetype,
+                    angle=angle[cell]))
+        Note, all capital for user-defined arrays.
+
+        Parameters
+        ----------
+        vp0 : np.array
+            reference P-velocity per medium
+        vs0 : np.array
+            reference S-velocity per medium
+        delta : np.array, default is 0.
+            Thomsen parameter delta per medium
+        epsilon : np.array, default is 0.
+            Thomsen parameter epsilon per medium
+        wavetype : tuple of char, default is ("P", "SV")
+            "P" : P-wave
+            "SV" : S-wave
+        ggg : np.array, default is 0. (neutral)
+            stretch factors
+
+        Returns
+        -------
+        table : np.array ([n_media x n_wave x n_stretch x 3])
+            reference velocity (modified only if stretched), s2 and s4,
+            contiguous
+        index : np.array of int ([n_media x n_wave x n_stretch])
+            row of each entry in table.reshape(-1, 3)
+
+        """
+        # pylint:disable=too-many-arguments,too-many-locals
+        # media along the first, stretches along the last axis
+        vp0 = np.reshape(np.asarray(vp0, dtype=float), (-1, 1))
+        vs0 = np.reshape(np.asarray(vs0, dtype=float), (-1, 1))
+        delta = np.reshape(np.asarray(delta, dtype=float), (-1, 1))
+        epsilon = np.reshape(np.asarray(epsilon, dtype=float), (-1, 1))
+        ggg = np.reshape(np.asarray(ggg, dtype=float), (1, -1))
+        # shortcuts for computing squared phase-velocity parameters
+        vps2 = (vp0 / vs0) ** 2
+        fac = 1. + 2. * vps2 / (vps2 - 1.) * delta
+        # allocate table
+        nmedia = max(len(vp0), len(vs0), len(delta), len(epsilon))
+        table = np.empty((nmedia, len(wavetype), ggg.size, 3), dtype=float)
+        # compute each wavetype
+        for iii, wave in enumerate(wavetype):
+            # check wavetype
+            TTWean.ttwave(wavetype=wave)
+            # compute squared phase-velocity parameters for a qP-wave
+            if wave == "P":
+                vel0 = vp0
+                rrr2 = 2. * delta
+                rrr4 = 2. * (epsilon - delta) * fac
+            # compute squared phase-velocity parameters for a qSV-wave
+            if wave == "SV":
+                vel0 = vs0
+                rrr2 = 2. * vps2 * (epsilon - delta)
+                rrr4 = -1. * rrr2 * fac
+            # stretch (neutral for ggg = 0.)
+            vel0 = vel0 * np.sqrt(1. + ggg)
+            rrr2 = (rrr2 - ggg) / (1. + ggg)
+            rrr4 = rrr4 / ((1. + ggg) ** 2)
+            # compute squared energy-velocity parameters
+            ttt2 = rrr2 / (1. + rrr2)
+            ttt4 = (
+                (rrr2 ** 2 * (1. + rrr2) ** 2 + rrr4)
+                /
+                (1. + rrr2) ** 4)
+            # compute linear energy velocity parameters
+            table[:, iii, :, 0] = vel0
+            table[:, iii, :, 1] = ttt2 / 2.
+            table[:, iii, :, 2] = -1. * ttt2 ** 2 / 8. + ttt4 / 2.
+        # index map
+        index = np.arange(table.size // 3).reshape(table.shape[:-1])
+        # return
+        return table, index
+
     # compute energy velocity
     @staticmethod
     def ttvel(
             vp0:float=None, vs0:float=None,
-            sss:np.array=np.array([[1.],[np.nan],[0.],[np.nan],[0]]),
+            sss:np.array=ISOTROPY,
             wavetype:str="P", angle:float=None) -> float:
         """
         Compute a linear energy velocity for a given directional angle.
@@ -194,9 +360,10 @@ class TTWean():
             reference P-velocity
         vs0 : float
             reference S-velocity
-        sss : np.array ([5x1]), default to isotropy
-            linear energy-velocity parameters
-            note, s1=1, s2 and s4 in use, s1 and s3 set to np.NAN
+        sss : np.array (record of SSS), default to isotropy
+            linear energy-velocity parameters s2 and s4
+            note, the old [5x1] array (s0=1, s2 and s4 in use, s1 and s3 set
+            to np.nan) is still accepted
         wavetype : char
             "P" : P-wave
             "SV" : S-wave
@@ -210,14 +377,423 @@ class TTWean():
             wavetype, and linear energy-velocity parameters.
 
         """
+        # check wavetype
+        TTWean.ttwave(wavetype=wavetype)
+        # adapt the old [5x1] array
+        if sss.dtype.names is None:
+            sss = TTWean.ttcompact(sss=sss)
         # trig values for phase angles
         sin = np.sin(angle)
         sin2 = sin * sin
         # velocity
         vel = (
-            {"P": vp0, "SV": vs0}[wavetype]               # reference velocity
-            *                                             # *
-            (1. + (sss[2,0] + sss[4,0] * sin2) * sin2))   # (angle-dependent)
+            {"P": vp0, "SV": vs0}[wavetype]                   # reference vel.
+            *                                                 # *
+            (1. + (sss["s2"] + sss["s4"] * sin2) * sin2))     # (angle-dep.)
+        # return
+        return vel
+
+
+    # compute energy velocities for arrays of cells and angles
+    @staticmethod
+    def ttvels(
+            vp0:np.array=None, vs0:np.array=None, sss:np.array=None,
+            wavetype:str="P", angle:np.array=None, medium:np.array=None,
+            out:np.array=None, table:np.array=None) -> np.array:
+        """
+        Compute linear energy velocities for arrays of cells and angles.
+
+        ttvels is ttvel batched: one call computes the energy velocities of
+        all cells of a grid for their incidence angles, instead of one call
+        per cell and angle. The arguments broadcast against each other like
+        any NumPy operation.
+
+        Typically, with the output of ttinit stacked per cell,
+            sss[cell] = np.stack([sss for each cell])
+            vel[cell] = (
+                ttvels(
+                    vp0=vp0[cell], vs0=vs0[cell], sss=sss[cell],
+                    wavetype=wavetype, angle=angle[cell]))
+        or, with the output of ttinit stacked per medium instead, and a
+        medium index per cell,
+            vel[cell] = (
+                ttvels(
+                    vp0=vp0[medium], vs0=vs0[medium], sss=sss[medium],
+                    wavetype=wavetype, angle=angle[cell],
+                    medium=index[cell]))
+        or, with the table of tttable and its index map for each cell,
+            vel[cell] = (
+                ttvels(
+                    table=table, medium=row[cell], wavetype=wavetype,
+                    angle=angle[cell]))
+
+        Parameters
+        ----------
+        vp0 : float or np.array
+            reference P-velocity per cell, or per medium if medium is given
+        vs0 : float or np.array
+            reference S-velocity per cell, or per medium if medium is given
+        sss : np.array (of SSS)
+            linear energy-velocity parameters per cell, or per medium if
+            medium is given
+            note, the old [5xn] array, per cell or medium along the second
+            axis, is still accepted
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+        angle : float or np.array
+            incidence angle in radiant
+        medium : np.array of int, default is None
+            medium index of each cell into vp0, vs0 and sss, or row of each
+            cell in table
+        out : np.array, default is None
+            array receiving the velocities, of the broadcast shape
+        table : np.array ([... x 3]), default is None
+            reference velocity, s2 and s4 as from tttable, replacing vp0, vs0
+            and sss; note, wavetype is then given by the row
+
+        Returns
+        -------
+        vel : np.array
+            magnitudes of the energy velocities
+
+        """
+        # pylint:disable=too-many-arguments
+        # reference velocity and linear energy-velocity parameters
+        if table is None:
+            if sss.dtype.names is None:
+                sss = TTWean.ttcompact(sss=sss)
+            vel0 = {"P": vp0, "SV": vs0}[TTWean.ttwave(wavetype=wavetype)]
+            sss2 = sss["s2"]
+            sss4 = sss["s4"]
+        else:
+            vel0, sss2, sss4 = table.reshape(-1, 3).T
+        # look up the parameters of the medium of each cell
+        if medium is not None:
+            vel0 = np.take(vel0, medium)
+            sss2 = np.take(sss2, medium)
+            sss4 = np.take(sss4, medium)
+        # squared sine of phase angles
+        sin2 = np.sin(angle)
+        sin2 *= sin2
+        # allocate velocities of the shape broadcast from all arguments
+        if out is None:
+            out = (
+                np.empty(
+                    np.broadcast_shapes(
+                        np.shape(sss4), np.shape(sin2), np.shape(vel0)),
+                    dtype=np.result_type(sss4, sin2, vel0)))
+        # velocity, (angle-dependent) by Horner's scheme * reference velocity
+        vel = np.multiply(sss4, sin2, out=out)
+        vel += sss2
+        vel *= sin2
+        vel += 1.
+        vel *= vel0
+        # return
+        return vel
+
+    # tabulate energy velocities at the stencil directions
+    @staticmethod
+    def ttstencil(
+            vp0:np.array=None, vs0:np.array=None, sss:np.array=None,
+            wavetype:str="P", angle:np.array=None,
+            table:np.array=None) -> np.array:
+        """
+        Precompute linear energy velocities at the stencil directions.
+
+        A grid solver probes the same few directions, its stencil, in every
+        time step. So, ttstencil evaluates the energy velocity of each medium
+        for each stencil direction once; a time step then gathers the velocity
+        of a cell from that lookup, with no trigonometric function evaluated.
+
+        Typically, with the output of ttinit stacked per medium,
+            lookup = (
+                ttstencil(
+                    vp0=vp0, vs0=vs0, sss=sss, wavetype=wavetype,
+                    angle=STENCIL))
+        or, with the table of tttable,
+            lookup = ttstencil(table=table, angle=STENCIL)
+        and, for each time step,
+            vel[cell] = lookup[medium[cell], direction[cell]]
+        where direction is the index of the stencil direction of a cell, and
+        medium its medium or, from the table, its row.
+        Note, all capital for user-defined arrays.
+
+        Parameters
+        ----------
+        vp0 : float or np.array
+            reference P-velocity per medium
+        vs0 : float or np.array
+            reference S-velocity per medium
+        sss : np.array (of SSS)
+            linear energy-velocity parameters per medium
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+        angle : np.array
+            incidence angles of the stencil directions in radiant
+        table : np.array ([... x 3]), default is None
+            reference velocity, s2 and s4 as from tttable, replacing vp0, vs0
+            and sss
+
+        Returns
+        -------
+        lookup : np.array ([n_media x n_directions])
+            magnitudes of the energy velocities, with n_media the number of
+            rows if from the table
+
+        """
+        # pylint:disable=too-many-arguments
+        # take the parameters from the table
+        if table is not None:
+            table = np.reshape(table, (-1, 3))
+            vp0 = vs0 = table[:, 0]
+            sss = np.empty(len(table), dtype=SSS)
+            sss["s2"] = table[:, 1]
+            sss["s4"] = table[:, 2]
+        # adapt the old [5xn] array
+        if sss.dtype.names is None:
+            sss = TTWean.ttcompact(sss=sss)
+        # media along the first, stencil directions along the second axis
+        lookup = (
+            TTWean.ttvels(
+                vp0=np.reshape(vp0, (-1, 1)), vs0=np.reshape(vs0, (-1, 1)),
+                sss=np.reshape(sss, (-1, 1)), wavetype=wavetype,
+                angle=np.reshape(angle, (1, -1))))
+        # return
+        return lookup
+
+    # expand a labelled model grid into cell arrays
+    @staticmethod
+    def ttmodel(
+            label:np.array=None, media:dict=None, wavetype:str="P",
+            ggg:float=0., dtype:type=float) -> dict:
+        """
+        Compute the per-cell parameters of a model grid labelled by medium.
+
+        Instead of calling ttinit per cell, ttmodel computes the parameters
+        of each medium once by tttable, then gathers them for all cells by
+        their labels. So, a model is prepared by a handful of vectorized
+        operations, however many cells, and the grid itself needs to hold
+        no more than a small integer label per cell.
+
+        Typically,
+            model = (
+                ttmodel(
+                    label=LABEL, media=MEDIA, wavetype="P" or "SV",
+                    ggg=GGG))
+            vel[cell] = (
+                model["vel0"][cell]
+                *
+                (1. + (model["s2"][cell] + model["s4"][cell] * sin2) * sin2))
+        with sin2 the squared sine of the incidence angle of a cell, measured
+        from the symmetry axis as tilted by model["tilt"][cell]; and
+        model["slowness"] for initializing a ttcrpy grid.
+        Note, all capital for user-defined arrays.
+
+        Parameters
+        ----------
+        label : np.array of int ([nx x nz] or [nx x ny x nz])
+            medium index per cell into media, preferably as np.int8 or
+            np.int16
+        media : dict
+            {"vp0": np.array, "vs0": np.array, "delta": np.array,
+             "epsilon": np.array, "tilt": np.array}, each per medium;
+            delta, epsilon and tilt (in radiant) are optional, default is 0.
+        wavetype : char
+            "P" : P-wave
+            "SV" : S-wave
+        ggg : float, default is 0. (neutral)
+            stretch factor; note, one only, call ttmodel per stretch factor of
+            a family
+        dtype : type, default is float
+            float type of the cell arrays, e.g. np.float32 to halve memory
+
+        Returns
+        -------
+        model : dict
+            {"vel0", "slowness", "s2", "s4", "tilt"}, each an np.array of the
+            shape of label: reference velocity (modified only if stretched),
+            its inverse, linear energy-velocity parameters, and tilt
+
+        """
+        # pylint:disable=too-many-arguments
+        # check stretch factor
+        # note, a family would mix up media and stretches in the table below
+        check = np.ndim(ggg) == 0
+        text = "TTWean.ttmodel: one stretch factor only, not an array!"
+        assert check, text
+        # compute the parameters per medium
+        table, _ = (
+            TTWean.tttable(
+                vp0=media["vp0"], vs0=media["vs0"],
+                delta=media.get("delta", 0.), epsilon=media.get("epsilon", 0.),
+                wavetype=(wavetype,), ggg=ggg))
+        table = table.reshape(-1, 3)
+        # tabulate per medium
+        column = {
+            "vel0": table[:, 0],
+            "slowness": 1. / table[:, 0],
+            "s2": table[:, 1],
+            "s4": table[:, 2],
+            "tilt": (
+                np.broadcast_to(media.get("tilt", 0.), len(table))
+                .astype(float))}
+        # gather per cell
+        model = {
+            key: np.take(value.astype(dtype), label)
+            for key, value in column.items()}
+        # return
+        return model
+
+    # convert from the old array
+    @staticmethod
+    def ttcompact(sss:np.array=None) -> np.array:
+        """
+        Convert linear energy-velocity parameters from the old [5xn] array.
+
+        Parameters
+        ----------
+        sss : np.array ([5x1] or [5xn])
+            linear energy-velocity parameters, per medium or cell along the
+            second axis
+
+        Returns
+        -------
+        sss : np.array (of SSS)
+            a record for [5x1], or n records for [5xn]
+
+        """
+        # single medium to a record, otherwise one record per column
+        sss = np.reshape(sss, (5, -1))
+        shape = () if sss.shape[1] == 1 else sss.shape[1:]
+        # copy s2 and s4
+        compact = np.empty(shape, dtype=SSS)
+        compact["s2"] = sss[2].reshape(shape)
+        compact["s4"] = sss[4].reshape(shape)
+        # return
+        return compact
+
+    # convert to the old array
+    @staticmethod
+    def ttexpand(sss:np.array=None) -> np.array:
+        """
+        Convert linear energy-velocity parameters to the old [5xn] array.
+
+        Parameters
+        ----------
+        sss : np.array (of SSS)
+            a record, or n records
+
+        Returns
+        -------
+        sss : np.array ([5x1] or [5xn])
+            linear energy-velocity parameters, per record along the second
+            axis; s0=1, s1 and s3 set to np.nan
+
+        """
+        # allocate with s1 and s3 not in use
+        expand = np.full((5, max(sss.size, 1)), fill_value=np.nan, dtype=float)
+        # copy s0, s2 and s4
+        expand[0] = 1.
+        expand[2] = np.ravel(sss["s2"])
+        expand[4] = np.ravel(sss["s4"])
+        # return
+        return expand
+
+
+class TTEval():
+    """
+    Evaluate the linear energy velocity of one medium, wavetype and stretch.
+
+    TTEval holds the reference velocity, s2 and s4 as plain floats, computed
+    once by ttinit, and cannot be modified afterwards. So, one evaluator can
+    be shared by all threads of a parallel ray tracer. A call for a single
+    angle works on floats only; a call for an array of angles writes into
+    the buffers given, and so allocates nothing.
+
+    Typically,
+        evaluator[medium,stretch,wavetype] = (
+            TTEval(
+                vp0=VP0, vs0=VS0, delta=DELTA, epsilon=EPSILON,
+                wavetype="P" or wavetype="SV", ggg=GGG))
+        vel = evaluator[medium,stretch,wavetype](angle)
+    or, per thread with its own buffers,
+        evaluator[medium,stretch,wavetype](angle, out=out, work=work)
+    Note, all capital for user-defined parameters.
+
+    """
+    __slots__ = ("vel0", "sss2", "sss4")
+
+    # initialize
+    def __init__(
+            self, vp0:float=None, vs0:float=None, delta:float=0.,
+            epsilon:float=0., wavetype:str="P", ggg:float=0.):
+        """
+        Precompute the linear energy-velocity parameters once.
+
+        Parameters
+        ----------
+        see TTWean.ttinit
+
+        """
+        # pylint:disable=too-many-arguments
+        # forward, checking the wavetype
+        vp0, vs0, sss = (
+            TTWean.ttinit(
+                vp0=vp0, vs0=vs0, delta=delta, epsilon=epsilon,
+                wavetype=wavetype, ggg=ggg))
+        # freeze as floats
+        object.__setattr__(
+            self, "vel0", float({"P": vp0, "SV": vs0}[wavetype]))
+        object.__setattr__(self, "sss2", float(sss["s2"]))
+        object.__setattr__(self, "sss4", float(sss["s4"]))
+
+    # prevent modification
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TTEval: {name} is read-only!")
+
+    # prevent deletion
+    def __delattr__(self, name):
+        raise AttributeError(f"TTEval: {name} is read-only!")
+
+    # evaluate
+    def __call__(
+            self, angle:float=None, out:np.array=None,
+            work:np.array=None) -> float:
+        """
+        Compute the linear energy velocity for given incidence angles.
+
+        Parameters
+        ----------
+        angle : float or np.array
+            incidence angle(s) in radiant
+        out : np.array, default is None
+            buffer receiving the velocities, of the shape of angle
+        work : np.array, default is None
+            scratch buffer of the shape of angle
+            note, use buffers of your own for each thread
+
+        Returns
+        -------
+        vel : float or np.array
+            magnitude(s) of the energy velocity; out if given
+
+        """
+        # single angle, floats only
+        if np.ndim(angle) == 0:
+            sin2 = math.sin(angle) ** 2
+            return self.vel0 * (1. + (self.sss2 + self.sss4 * sin2) * sin2)
+        # squared sine of phase angles
+        sin2 = np.sin(angle, out=out)
+        np.multiply(sin2, sin2, out=sin2)
+        # angle-dependent factor by Horner's scheme
+        fac = np.multiply(sin2, self.sss4, out=work)
+        fac += self.sss2
+        # velocity, reference velocity * (1 + angle-dependent term)
+        vel = np.multiply(sin2, fac, out=sin2)
+        vel += 1.
+        vel *= self.vel0
         # return
         return vel
 
@@ -248,8 +824,8 @@ def main():
     text += f"post-stretch with g = {GGG}\n"   # stretch factor
     text += f"vp0 = {vp0}\n"                   # P-reference velocity
     text += f"vs0 = {vs0}\n"                   # S-reference velocity
-    text += f"s\u2082 = {sss[2,0]}\n"          # lin. energy-velocity para. 2
-    text += f"s\u2084 = {sss[4,0]}\n"          # lin. energy-velocity para. 4
+    text += f"s\u2082 = {sss['s2']}\n"         # lin. energy-velocity para. 2
+    text += f"s\u2084 = {sss['s4']}\n"         # lin. energy-velocity para. 4
     text += f"v({ANGLE}\u00b0) = {vel}"        # energy velocity (angle)
     print(text)
 